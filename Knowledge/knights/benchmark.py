@@ -0,0 +1,58 @@
+import itertools
+import sys
+import time
+
+from logic import compile_sentence
+from puzzle import knowledge0, knowledge1, knowledge2, knowledge3
+
+ROUNDS = 200
+
+PUZZLES = [
+    ("Puzzle 0", knowledge0),
+    ("Puzzle 1", knowledge1),
+    ("Puzzle 2", knowledge2),
+    ("Puzzle 3", knowledge3),
+]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) == 2 else ROUNDS
+    for name, knowledge in PUZZLES:
+        symbols = sorted(knowledge.symbols())
+        models = [
+            dict(zip(symbols, values))
+            for values in itertools.product([True, False], repeat=len(symbols))
+        ]
+
+        start = time.perf_counter()
+        compiled = compile_sentence(knowledge)
+        compile_time = time.perf_counter() - start
+
+        interpreted_time = benchmark(knowledge.evaluate, models, rounds)
+        compiled_time = benchmark(compiled, models, rounds)
+
+        # Both paths must agree on every model
+        for model in models:
+            if compiled(model) != knowledge.evaluate(model):
+                sys.exit(f"{name}: compiled sentence disagrees on {model}")
+
+        evaluations = rounds * len(models)
+        print(name)
+        print(f"    Models: {len(models)}, evaluations: {evaluations}")
+        print(f"    Sentence.evaluate: {interpreted_time / evaluations * 1e6:.2f} us/eval")
+        print(f"    compile_sentence:  {compiled_time / evaluations * 1e6:.2f} us/eval"
+              f" (compiled in {compile_time * 1e3:.2f} ms)")
+        print(f"    Speedup: {interpreted_time / compiled_time:.1f}x")
+
+
+def benchmark(evaluate, models, rounds):
+    """Returns the time taken to evaluate every model `rounds` times."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for model in models:
+            evaluate(model)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -235,8 +235,8 @@ def model_check(knowledge, query):
         if not symbols:
 
             # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+            if knowledge(model):
+                return query(model)
             return True
         else:
 
@@ -259,5 +259,151 @@ def model_check(knowledge, query):
     # Get all symbols in both knowledge and query
     symbols = set.union(knowledge.symbols(), query.symbols())
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Check that knowledge entails query, evaluating compiled sentences
+    return check_all(compile_sentence(knowledge), compile_sentence(query),
+                     symbols, dict())
+
+
+def compile_sentence(sentence, constants=None):
+    """
+    Lowers a logical sentence to a flat Python function of `model`.
+
+    The returned function takes the same `model` dict as
+    `Sentence.evaluate` and returns the same truth value. Symbols fixed
+    in `constants` are folded away at compile time, repeated
+    subexpressions are evaluated at most once per call, and the
+    generated code keeps Python's short-circuiting of `and` and `or`.
+    """
+    Sentence.validate(sentence)
+    constants = constants or dict()
+
+    # Count how often each (folded) subexpression occurs
+    occurrences = dict()
+
+    def fold(node):
+        """Returns True, False or a hashable key for the folded node."""
+        if isinstance(node, Symbol):
+            if node.name in constants:
+                return bool(constants[node.name])
+            return ("symbol", node.name)
+
+        if isinstance(node, Not):
+            operand = fold(node.operand)
+            if isinstance(operand, bool):
+                return not operand
+            # Double negation cancels out
+            if operand[0] == "not":
+                return operand[1]
+            return count(("not", operand))
+
+        if isinstance(node, (And, Or)):
+            is_and = isinstance(node, And)
+            children = node.conjuncts if is_and else node.disjuncts
+            # A false conjunct (or true disjunct) decides the whole sentence
+            absorbing = not is_and
+            operands = []
+            for child in children:
+                operand = fold(child)
+                if isinstance(operand, bool):
+                    if operand == absorbing:
+                        return absorbing
+                    continue
+                if operand not in operands:
+                    operands.append(operand)
+            if not operands:
+                return not absorbing
+            if len(operands) == 1:
+                return operands[0]
+            return count(("and" if is_and else "or", tuple(operands)))
+
+        if isinstance(node, Implication):
+            antecedent = fold(node.antecedent)
+            consequent = fold(node.consequent)
+            if antecedent is False or consequent is True:
+                return True
+            if antecedent is True:
+                return consequent
+            if consequent is False:
+                return negate(antecedent)
+            return count(("implies", antecedent, consequent))
+
+        if isinstance(node, Biconditional):
+            left = fold(node.left)
+            right = fold(node.right)
+            if isinstance(left, bool) and isinstance(right, bool):
+                return left == right
+            if isinstance(left, bool):
+                left, right = right, left
+            if right is True:
+                return left
+            if right is False:
+                return negate(left)
+            if left == right:
+                return True
+            return count(("biconditional", left, right))
+
+        raise TypeError(f"cannot compile {type(node).__name__}")
+
+    def negate(key):
+        if key[0] == "not":
+            return key[1]
+        return count(("not", key))
+
+    def count(key):
+        occurrences[key] = occurrences.get(key, 0) + 1
+        return key
+
+    root = fold(sentence)
+    if isinstance(root, bool):
+        def evaluate(model):
+            return root
+        return evaluate
+
+    # Give every symbol and every repeated subexpression its own local
+    names = dict()
+
+    def emit(key):
+        kind = key[0]
+        if kind == "symbol":
+            if key not in names:
+                names[key] = f"s{len(names)}"
+            return names[key]
+        if kind == "not":
+            code = f"not {emit(key[1])}"
+        elif kind == "and":
+            code = " and ".join(emit(operand) for operand in key[1])
+        elif kind == "or":
+            code = " or ".join(emit(operand) for operand in key[1])
+        elif kind == "implies":
+            code = f"not {emit(key[1])} or {emit(key[2])}"
+        else:
+            code = f"{emit(key[1])} == {emit(key[2])}"
+        if occurrences.get(key, 0) > 1:
+            # Evaluated lazily on first use, then reused
+            if key not in names:
+                names[key] = f"c{len(names)}"
+            local = names[key]
+            return f"({local} if {local} is not None else ({local} := ({code})))"
+        return f"({code})"
+
+    body = emit(root)
+    lines = ["def evaluate(model):"]
+    symbols = [(key[1], local) for key, local in names.items()
+               if key[0] == "symbol"]
+    if symbols:
+        lines.append("    try:")
+        for name, local in symbols:
+            lines.append(f"        {local} = bool(model[{name!r}])")
+        lines.append("    except KeyError as error:")
+        lines.append(
+            "        raise Exception("
+            "f\"variable {error.args[0]} not in model\") from None"
+        )
+    for key, local in names.items():
+        if key[0] != "symbol":
+            lines.append(f"    {local} = None")
+    lines.append(f"    return {body}")
+
+    namespace = dict()
+    exec(compile("\n".join(lines), "<compiled sentence>", "exec"), namespace)
+    return namespace["evaluate"]
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class ArrayMinesweeper:
+    """
+    Minesweeper game representation backed by NumPy arrays,
+    with the same interface as `minesweeper.Minesweeper`.
+    Neighbor counts for every cell are computed once, up front.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, rng=None):
+        # Set initial width, height, and random number generator
+        self.height = height
+        self.width = width
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Place mines by sampling distinct cells without replacement
+        board = np.zeros(height * width, dtype=bool)
+        board[self.rng.choice(height * width, size=mines, replace=False)] = True
+        self.board = board.reshape(height, width)
+        self.mines = set(map(tuple, np.argwhere(self.board).tolist()))
+
+        # Number of mines around every cell
+        self.counts = neighbor_counts(self.board)
+
+        # At first, player has found no mines
+        self.mines_found = set()
+
+    def print(self):
+        """
+        Prints a text-based representation
+        of where mines are located.
+        """
+        for row in self.board:
+            print("--" * self.width + "-")
+            print("".join("|X" if mine else "| " for mine in row) + "|")
+        print("--" * self.width + "-")
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.board[i, j])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        """
+        return self.mines_found == self.mines
+
+    def reveal(self, cell, revealed=None):
+        """
+        Reveals a safe cell, and flood-fills outwards from cells with no
+        nearby mines, as clicking a cell does in the usual game.
+
+        Cells in `revealed` are skipped. Returns a list of
+        `(cell, nearby_mines)` pairs for every newly revealed cell,
+        or an empty list if `cell` is a mine.
+        """
+        if self.is_mine(cell):
+            return []
+        seen = np.zeros((self.height, self.width), dtype=bool)
+        for i, j in revealed or ():
+            seen[i, j] = True
+        if seen[cell]:
+            return []
+
+        result = []
+        seen[cell] = True
+        stack = [cell]
+        while stack:
+            i, j = stack.pop()
+            count = int(self.counts[i, j])
+            result.append(((i, j), count))
+            if count:
+                continue
+            # A cell with no nearby mines reveals all of its neighbors
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    ni, nj = i + di, j + dj
+                    if (0 <= ni < self.height and 0 <= nj < self.width
+                            and not seen[ni, nj]):
+                        seen[ni, nj] = True
+                        stack.append((ni, nj))
+        return result
+
+
+def neighbor_counts(board):
+    """
+    Return an array with the number of mines around each cell of `board`,
+    computed as a 3x3 convolution over the zero-padded board.
+    """
+    height, width = board.shape
+    padded = np.pad(board.astype(np.uint8), 1)
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for di in range(3):
+        for dj in range(3):
+            counts += padded[di:di + height, dj:dj + width]
+    # The cell itself is not one of its neighbors
+    return counts - board
@@ -1,5 +1,7 @@
-import itertools
 import random
+from collections import deque
+
+from probability import mine_probabilities
 
 
 class Minesweeper:
@@ -93,12 +95,51 @@ class Sentence:
         self.cells = set(cells)
         self.count = count
 
+    @classmethod
+    def from_cells(cls, cells, count, width):
+        """
+        Creates a sentence about cells on a board `width` cells wide.
+        """
+        return cls(cells, count)
+
+    @staticmethod
+    def key(cell, width):
+        """
+        Returns the key under which the AI indexes `cell`: the cell itself.
+        """
+        return cell
+
+    def keys(self):
+        """
+        Returns the keys of the cells in this sentence.
+        """
+        return self.cells
+
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((frozenset(self.cells), self.count))
+
+    def __len__(self):
+        return len(self.cells)
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def issubset(self, other):
+        """
+        Returns True if every cell in this sentence is also in `other`.
+        """
+        return self.cells <= other.cells
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells in this sentence but not in
+        `other`, which must be a subset of this sentence.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -137,16 +178,157 @@ class Sentence:
             self.cells.remove(cell)
 
 
+class BitSentence:
+    """
+    Logical statement about a Minesweeper game, with the same interface
+    as Sentence, storing its cells as the set bits of an integer.
+    Cell (i, j) of a board `width` cells wide is bit i * width + j.
+    """
+
+    __slots__ = ("mask", "count", "width")
+
+    def __init__(self, cells, count, width):
+        mask = 0
+        for i, j in cells:
+            if not 0 <= j < width:
+                raise ValueError(f"cell {(i, j)} outside a board {width} wide")
+            mask |= 1 << (i * width + j)
+        self.mask = mask
+        self.count = count
+        self.width = width
+
+    @classmethod
+    def from_cells(cls, cells, count, width):
+        """
+        Creates a sentence about cells on a board `width` cells wide.
+        """
+        return cls(cells, count, width)
+
+    @classmethod
+    def from_mask(cls, mask, count, width):
+        """
+        Creates a sentence directly from a bitmask of cells.
+        """
+        sentence = cls.__new__(cls)
+        sentence.mask = mask
+        sentence.count = count
+        sentence.width = width
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        Returns the set of cells whose bits are set.
+        """
+        cells = set()
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            cells.add(divmod(low.bit_length() - 1, self.width))
+            mask ^= low
+        return cells
+
+    @staticmethod
+    def key(cell, width):
+        """
+        Returns the key under which the AI indexes `cell`: its bit number.
+        """
+        return cell[0] * width + cell[1]
+
+    def keys(self):
+        """
+        Yields the bit numbers of the cells in this sentence, without
+        building the set of cells.
+        """
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def bit(self, cell):
+        return 1 << (cell[0] * self.width + cell[1])
+
+    def __eq__(self, other):
+        return self.mask == other.mask and self.count == other.count
+
+    def __hash__(self):
+        return hash((self.mask, self.count))
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in self.cells known to be mines.
+        """
+        if len(self) == self.count and self.count != 0:
+            return self.cells
+        return set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in self.cells known to be safe.
+        """
+        if self.count == 0:
+            return self.cells
+        return set()
+
+    def mark_mine(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be a mine.
+        """
+        bit = self.bit(cell)
+        if self.mask & bit:
+            self.mask ^= bit
+            self.count -= 1
+
+    def mark_safe(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be safe.
+        """
+        self.mask &= ~self.bit(cell)
+
+    def issubset(self, other):
+        """
+        Returns True if every cell in this sentence is also in `other`.
+        """
+        return self.mask & other.mask == self.mask
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells in this sentence but not in
+        `other`, which must be a subset of this sentence.
+        """
+        return BitSentence.from_mask(
+            self.mask & ~other.mask, self.count - other.count, self.width
+        )
+
+
 class MinesweeperAI:
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, time_budget=0.05,
+                 sentence_class=None):
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known, and the time in
+        # seconds a random move may spend estimating mine probabilities
+        self.mine_count = mines
+        self.time_budget = time_budget
+
+        # Representation used for sentences: Sentence or BitSentence
+        self.sentence_class = sentence_class or Sentence
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -154,8 +336,60 @@ class MinesweeperAI:
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of sentences about the game known to be true. Sentences are
+        # never mutated while they are in the set, so their hashes stay valid
+        self.knowledge = set()
+
+        # Map from each cell's key (see `Sentence.key`) to the sentences in
+        # the knowledge base containing it
+        self.index = dict()
+
+        # Worklist of sentences that are new or changed and still need to be
+        # examined, and the number of sentences examined during the last move
+        self.pending = deque()
+        self.queued = set()
+        self.propagations = 0
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and indexes it by its cells.
+        Empty and duplicate sentences are ignored, and added sentences
+        are queued to be examined by `propagate`.
+        Returns True if the sentence was added.
+        """
+        if not sentence or sentence in self.knowledge:
+            return False
+        self.knowledge.add(sentence)
+        for key in sentence.keys():
+            self.index.setdefault(key, set()).add(sentence)
+        # Sentences are queued by identity, as their contents may change while queued
+        if id(sentence) not in self.queued:
+            self.queued.add(id(sentence))
+            self.pending.append(sentence)
+        return True
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base and from the index.
+        """
+        self.knowledge.discard(sentence)
+        for key in sentence.keys():
+            containing = self.index.get(key)
+            if containing is not None:
+                containing.discard(sentence)
+                if not containing:
+                    del self.index[key]
+
+    def related_sentences(self, sentence):
+        """
+        Returns the set of other sentences sharing at least one cell
+        with `sentence`.
+        """
+        related = set()
+        for key in sentence.keys():
+            related.update(self.index.get(key, ()))
+        related.discard(sentence)
+        return related
 
     def mark_mine(self, cell):
         """
@@ -163,8 +397,13 @@ class MinesweeperAI:
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        # Only sentences containing the cell can change. Each one is taken out
+        # of the knowledge base before it is updated, then put back in
+        key = self.sentence_class.key(cell, self.width)
+        for sentence in list(self.index.get(key, ())):
+            self.remove_sentence(sentence)
             sentence.mark_mine(cell)
+            self.add_sentence(sentence)
 
     def mark_safe(self, cell):
         """
@@ -172,8 +411,21 @@ class MinesweeperAI:
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        key = self.sentence_class.key(cell, self.width)
+        for sentence in list(self.index.get(key, ())):
+            self.remove_sentence(sentence)
             sentence.mark_safe(cell)
+            self.add_sentence(sentence)
+
+    def mark_known(self, sentence):
+        """
+        Marks every cell of `sentence` known to be a mine or safe.
+        """
+        # copy() is needed as marking cells removes them from the sentence
+        for cell in sentence.known_mines().copy():
+            self.mark_mine(cell)
+        for cell in sentence.known_safes().copy():
+            self.mark_safe(cell)
 
     def add_knowledge(self, cell, count):
         """
@@ -211,48 +463,45 @@ class MinesweeperAI:
                         # If the cell is not in safes, we can add it to the sentence
                         if not (i, j) in self.safes:
                             neighbours.add((i, j))
-        # Create a new sentence with the neighbours set and the count given
-        if len(neighbours) > 0:
-            new_sentence = Sentence(neighbours, count)
-            # Add the new sentence to the knowledge base
-            self.knowledge.append(new_sentence)
-
-        # Loop through all sentences in the knowledge base and infer new mines and new safes
-        for sentence in self.knowledge:
-            if sentence.known_mines():
-                # copy() is needed as the known_mines() and known_safes() functions remove cells from the sentence
-                for cell in sentence.known_mines().copy():
-                    self.mark_mine(cell)
-            if sentence.known_safes():
-                for cell in sentence.known_safes().copy():
-                    self.mark_safe(cell)
-
-        # Loop through all combinations of sentences in the knowledge base and infer new sentences
-        for sentence1, sentence2 in itertools.combinations(self.knowledge, 2):
-            if sentence1.cells.issubset(sentence2.cells):
-                new_cells = sentence2.cells - sentence1.cells
-                new_count = sentence2.count - sentence1.count
-                new_sentence = Sentence(new_cells, new_count)
-                if new_sentence not in self.knowledge:
-                    self.knowledge.append(new_sentence)
-            elif sentence2.cells.issubset(sentence1.cells):
-                new_cells = sentence1.cells - sentence2.cells
-                new_count = sentence1.count - sentence2.count
-                new_sentence = Sentence(new_cells, new_count)
-                if new_sentence not in self.knowledge:
-                    self.knowledge.append(new_sentence)
-            if new_sentence.known_mines():
-                # copy() is needed as the known_mines() and known_safes() functions remove cells from the sentence
-                for cell in new_sentence.known_mines().copy():
-                    self.mark_mine(cell)
-            if new_sentence.known_safes():
-                for cell in new_sentence.known_safes().copy():
-                    self.mark_safe(cell)
-
-        # Loop through all sentences in the knowledge base and remove empty sentences
-        for sentence in self.knowledge.copy():
-            if len(sentence.cells) == 0:
-                self.knowledge.remove(sentence)
+        # Create a new sentence with the neighbours set and the count given and add it to the knowledge base
+        self.add_sentence(
+            self.sentence_class.from_cells(neighbours, count, self.width)
+        )
+
+        # Infer new mines, safes and sentences until nothing more can be concluded
+        self.propagate()
+
+    def propagate(self):
+        """
+        Examines queued sentences until the knowledge base reaches a fixpoint.
+
+        Each examined sentence has its known mines and safes marked and is
+        compared with the sentences sharing a cell with it; a sentence that
+        is a subset of another yields their difference as a new sentence.
+        Marking cells and adding sentences queue the sentences they touch,
+        so only sentences affected by a change are examined again.
+
+        Returns the number of sentences examined, which is also stored in
+        `self.propagations`.
+        """
+        propagations = 0
+        while self.pending:
+            sentence = self.pending.popleft()
+            self.queued.discard(id(sentence))
+            # Skip sentences that have since been removed or replaced
+            if sentence not in self.knowledge:
+                continue
+            propagations += 1
+            self.mark_known(sentence)
+            if not sentence:
+                continue
+            for other in self.related_sentences(sentence):
+                if len(sentence) < len(other) and sentence.issubset(other):
+                    self.add_sentence(other.difference(sentence))
+                elif len(other) < len(sentence) and other.issubset(sentence):
+                    self.add_sentence(sentence.difference(other))
+        self.propagations = propagations
+        return propagations
 
     def make_safe_move(self):
         """
@@ -274,6 +523,10 @@ class MinesweeperAI:
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+
+        Among those cells, the one least likely to be a mine is chosen,
+        with ties broken randomly. If the probabilities cannot be
+        estimated, any of the cells may be chosen.
         """
         possible_moves = []
         # Go through entire board and see if the cell is in the moves made or mines list. If not, add it to the list of possible moves
@@ -281,8 +534,22 @@ class MinesweeperAI:
             for j in range(self.width):
                 if not (i, j) in self.moves_made and not (i, j) in self.mines:
                     possible_moves.append((i, j))
-        # Try and except block to return a random move from the list of possible moves. If there are no possible moves, random.choice will throw an error, so return None
-        try:
-            return random.choice(possible_moves)
-        except:
+        if not possible_moves:
             return None
+
+        # Estimate the probability of each unknown cell being a mine from the knowledge base
+        unknown = set(possible_moves) - self.safes
+        mines_left = (
+            None if self.mine_count is None else self.mine_count - len(self.mines)
+        )
+        probabilities = mine_probabilities(
+            [(sentence.cells, sentence.count) for sentence in self.knowledge],
+            unknown, mines_left, self.time_budget
+        )
+        if not probabilities:
+            return random.choice(possible_moves)
+        lowest = min(probabilities.values())
+        return random.choice([
+            cell for cell, probability in probabilities.items()
+            if probability <= lowest + 1e-12
+        ])
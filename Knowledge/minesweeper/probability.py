@@ -0,0 +1,352 @@
+import math
+import random
+import time
+
+# Largest component (in cells) that is enumerated exactly
+ENUMERATION_LIMIT = 24
+
+# Number of search nodes visited between checks of the time budget
+CHECK_INTERVAL = 1024
+
+
+class OutOfTime(Exception):
+    pass
+
+
+def mine_probabilities(constraints, unknown, mines_left=None, time_budget=0.05):
+    """
+    Estimate the probability that each unknown cell is a mine.
+
+    `constraints` is a list of `(cells, count)` pairs stating that exactly
+    `count` of `cells` are mines, `unknown` is the set of all cells whose
+    state is unknown, and `mines_left` is the number of mines among them
+    (or None if the total number of mines is not known).
+
+    The frontier (cells mentioned by some constraint) is split into
+    independent components, which share the time budget evenly. Each
+    component is enumerated exactly if it is small enough and that takes
+    at most half of its share, and sampled otherwise. The
+    components are then weighted by the number of ways to place the
+    remaining mines among unconstrained cells.
+
+    Returns a dictionary mapping every unknown cell to a probability,
+    or None if the constraints have no solution.
+    """
+    deadline = time.perf_counter() + time_budget
+    constraints = [
+        (tuple(cells), count) for cells, count in constraints if cells
+    ]
+    components = split_components(constraints)
+    frontier = set()
+    for cells, _ in components:
+        frontier.update(cells)
+    outside = len(unknown) - len(frontier)
+
+    # Count the solutions of each component by number of mines used
+    solutions = []
+    for position, (cells, component_constraints) in enumerate(components):
+        # Share the remaining time evenly between the remaining components
+        remaining = deadline - time.perf_counter()
+        component_deadline = (
+            time.perf_counter() + max(remaining, 0) / (len(components) - position)
+        )
+        counts = None
+        if len(cells) <= ENUMERATION_LIMIT:
+            # Enumeration may use half of the share, so that sampling in
+            # the other half if it runs out leaves later components theirs
+            now = time.perf_counter()
+            try:
+                counts = enumerate_component(
+                    cells, component_constraints, mines_left,
+                    now + (component_deadline - now) / 2
+                )
+            except OutOfTime:
+                pass
+        if counts is None:
+            counts = sample_component(
+                cells, component_constraints, mines_left, component_deadline
+            )
+        if not counts:
+            return None
+        solutions.append((cells, normalize_counts(counts)))
+
+    totals = [dict((k, total) for k, (total, _) in counts.items())
+              for _, counts in solutions]
+
+    # Weight of using k mines on the frontier, from the unconstrained cells
+    def outside_weight(k):
+        if mines_left is None:
+            return 0.0
+        left = mines_left - k
+        if left < 0 or left > outside:
+            return None
+        return log_comb(outside, left)
+
+    probabilities = dict()
+    prefixes = [{0: 1.0}]
+    for total in totals:
+        prefixes.append(convolve(prefixes[-1], total))
+    suffixes = [{0: 1.0}]
+    for total in reversed(totals):
+        suffixes.append(convolve(suffixes[-1], total))
+    suffixes.reverse()
+
+    # Posterior distribution of the number of mines on the whole frontier
+    frontier_mines = weigh(prefixes[-1], outside_weight)
+    if not frontier_mines:
+        return None
+
+    for position, (cells, counts) in enumerate(solutions):
+        rest = weigh(convolve(prefixes[position], suffixes[position + 1]),
+                     outside_weight, shift=counts)
+        normalizer = 0
+        mines = [0] * len(cells)
+        for k, (total, cell_counts) in counts.items():
+            weight = rest.get(k, 0)
+            normalizer += total * weight
+            for i, count in enumerate(cell_counts):
+                mines[i] += count * weight
+        for cell, count in zip(cells, mines):
+            probabilities[cell] = count / normalizer if normalizer else 0
+
+    # Unconstrained cells share the mines not used on the frontier
+    if outside:
+        if mines_left is None:
+            outside_probability = (
+                sum(probabilities.values()) / len(probabilities)
+                if probabilities else 0.5
+            )
+        else:
+            outside_probability = sum(
+                weight * (mines_left - k) for k, weight in frontier_mines.items()
+            ) / outside
+        for cell in unknown:
+            if cell not in frontier:
+                probabilities[cell] = outside_probability
+    return probabilities
+
+
+def split_components(constraints):
+    """
+    Group constraints that share cells into independent components.
+    Returns a list of `(cells, constraints)` pairs.
+    """
+    parent = dict()
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            parent[find(cell)] = root
+
+    groups = dict()
+    for cells, count in constraints:
+        groups.setdefault(find(cells[0]), []).append((cells, count))
+
+    components = []
+    for group in groups.values():
+        # Order cells so that each constraint is completed as early as possible
+        cells = []
+        seen = set()
+        for constraint_cells, _ in group:
+            for cell in constraint_cells:
+                if cell not in seen:
+                    seen.add(cell)
+                    cells.append(cell)
+        components.append((cells, group))
+    return components
+
+
+def component_tables(cells, constraints):
+    """
+    Return, for each cell position, the indices of the constraints
+    containing it, together with the constraint counts and sizes.
+    """
+    position = dict((cell, i) for i, cell in enumerate(cells))
+    containing = [[] for _ in cells]
+    counts = []
+    sizes = []
+    for c, (constraint_cells, count) in enumerate(constraints):
+        counts.append(count)
+        sizes.append(len(constraint_cells))
+        for cell in constraint_cells:
+            containing[position[cell]].append(c)
+    return containing, counts, sizes
+
+
+def enumerate_component(cells, constraints, mines_left, deadline):
+    """
+    Count every solution of a component exactly.
+
+    Returns a dictionary mapping a number of mines `k` to a pair
+    `(total, cell_counts)`: the number of solutions using `k` mines, and
+    for each cell, how many of those solutions place a mine on it.
+    Raises OutOfTime if `deadline` passes first.
+    """
+    containing, counts, unassigned = component_tables(cells, constraints)
+    assigned = [0] * len(counts)
+    assignment = [0] * len(cells)
+    limit = len(cells) if mines_left is None else mines_left
+    results = dict()
+    visited = [0]
+
+    def search(i, mines):
+        visited[0] += 1
+        if visited[0] % CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise OutOfTime
+        if i == len(cells):
+            total, cell_counts = results.setdefault(mines, [0, [0] * len(cells)])
+            results[mines][0] = total + 1
+            for j, value in enumerate(assignment):
+                cell_counts[j] += value
+            return
+        for value in (0, 1):
+            if mines + value > limit:
+                continue
+            if feasible(containing[i], value, assigned, unassigned, counts):
+                assignment[i] = value
+                search(i + 1, mines + value)
+            undo(containing[i], value, assigned, unassigned)
+        assignment[i] = 0
+
+    search(0, 0)
+    return dict((k, tuple(result)) for k, result in results.items())
+
+
+def sample_component(cells, constraints, mines_left, deadline):
+    """
+    Estimate the solution counts of a component by random search.
+
+    Each sample assigns cells in order, choosing uniformly among the values
+    that keep every constraint satisfiable, and is weighted by the product
+    of the number of choices available along the way (Knuth's estimator).
+    The weights are unbiased estimates of the solution counts, in the same
+    format as returned by `enumerate_component`.
+    Samples are drawn until `deadline`, and at least once.
+    """
+    containing, counts, sizes = component_tables(cells, constraints)
+    limit = len(cells) if mines_left is None else mines_left
+    results = dict()
+    samples = 0
+    while samples == 0 or time.perf_counter() < deadline:
+        samples += 1
+        assigned = [0] * len(counts)
+        unassigned = sizes.copy()
+        assignment = []
+        weight = 1
+        mines = 0
+        for i in range(len(cells)):
+            choices = []
+            for value in (0, 1):
+                if mines + value <= limit and feasible(
+                    containing[i], value, assigned, unassigned, counts
+                ):
+                    choices.append(value)
+                undo(containing[i], value, assigned, unassigned)
+            if not choices:
+                break
+            value = random.choice(choices)
+            weight *= len(choices)
+            mines += value
+            assignment.append(value)
+            for c in containing[i]:
+                assigned[c] += value
+                unassigned[c] -= 1
+        else:
+            total, cell_counts = results.setdefault(mines, [0, [0] * len(cells)])
+            results[mines][0] = total + weight
+            for j, value in enumerate(assignment):
+                if value:
+                    cell_counts[j] += weight
+    return dict((k, (total / samples, [count / samples for count in cell_counts]))
+                for k, (total, cell_counts) in results.items())
+
+
+def feasible(constraints, value, assigned, unassigned, counts):
+    """
+    Assign `value` to a cell in `constraints` and check that each of those
+    constraints can still be satisfied. The caller must call `undo`.
+    """
+    ok = True
+    for c in constraints:
+        assigned[c] += value
+        unassigned[c] -= 1
+        if assigned[c] > counts[c] or assigned[c] + unassigned[c] < counts[c]:
+            ok = False
+    return ok
+
+
+def undo(constraints, value, assigned, unassigned):
+    """
+    Reverse an assignment made by `feasible`.
+    """
+    for c in constraints:
+        assigned[c] -= value
+        unassigned[c] += 1
+
+
+def normalize_counts(counts):
+    """
+    Scale solution counts to sum to 1, which keeps products of many
+    components within floating point range without changing any ratio.
+    """
+    scale = sum(total for total, _ in counts.values())
+    if not scale:
+        return dict()
+    return dict(
+        (k, (total / scale, [count / scale for count in cell_counts]))
+        for k, (total, cell_counts) in counts.items()
+    )
+
+
+def convolve(first, second):
+    """
+    Return the distribution of the sum of two independent mine counts.
+    """
+    result = dict()
+    for i, p in first.items():
+        for j, q in second.items():
+            result[i + j] = result.get(i + j, 0) + p * q
+    return result
+
+
+def weigh(distribution, outside_weight, shift=None):
+    """
+    Multiply a distribution over frontier mine counts by the weight of
+    placing the remaining mines outside the frontier, and normalize.
+
+    Without `shift`, returns the weighted distribution. With `shift`
+    (one component's solution counts), returns for each of that
+    component's mine counts `k` the total weight of the other components,
+    as a dictionary from `k` to weight.
+    """
+    ks = list(shift) if shift is not None else [0]
+    logs = dict()
+    for k in ks:
+        for rest, p in distribution.items():
+            log_weight = outside_weight(k + rest)
+            if p > 0 and log_weight is not None:
+                logs[k, rest] = math.log(p) + log_weight
+    if not logs:
+        return dict()
+    top = max(logs.values())
+    result = dict()
+    for (k, rest), log_weight in logs.items():
+        key = rest if shift is None else k
+        result[key] = result.get(key, 0) + math.exp(log_weight - top)
+    total = sum(result.values())
+    return dict((key, weight / total) for key, weight in result.items())
+
+
+def log_comb(n, k):
+    """
+    Return the natural logarithm of the binomial coefficient C(n, k).
+    """
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
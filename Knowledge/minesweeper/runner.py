@@ -1,6 +1,6 @@
 import pygame
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 from minesweeper import Minesweeper, MinesweeperAI
 
@@ -8,6 +8,9 @@ HEIGHT = 8
 WIDTH = 8
 MINES = 8
 
+# Maximum frames drawn per second
+FPS = 30
+
 # Colors
 BLACK = (0, 0, 0)
 GRAY = (180, 180, 180)
@@ -17,6 +20,7 @@ WHITE = (255, 255, 255)
 pygame.init()
 size = width, height = 600, 400
 screen = pygame.display.set_mode(size)
+clock = pygame.time.Clock()
 
 # Fonts
 OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
@@ -37,186 +41,258 @@ flag = pygame.transform.scale(flag, (cell_size, cell_size))
 mine = pygame.image.load("assets/images/mine.png")
 mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
-# Create game and AI agent
-game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+# Pre-render the number shown on a revealed cell for every possible count
+numbers = [smallFont.render(str(count), True, BLACK) for count in range(9)]
+
+# Rectangles for every cell of the board
+cells = [
+    [
+        pygame.Rect(
+            board_origin[0] + j * cell_size,
+            board_origin[1] + i * cell_size,
+            cell_size, cell_size
+        )
+        for j in range(WIDTH)
+    ]
+    for i in range(HEIGHT)
+]
+
+# Buttons and status text area
+aiButton = pygame.Rect(
+    (2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50,
+    (width / 3) - BOARD_PADDING * 2, 50
+)
+resetButton = pygame.Rect(
+    (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 20,
+    (width / 3) - BOARD_PADDING * 2, 50
+)
+statusRect = pygame.Rect(
+    (2 / 3) * width, (2 / 3) * height - 25, width / 3, 50
+)
+
+# The AI runs on its own thread so that thinking never stalls drawing.
+# A single worker runs AI calls one at a time, in the order they are made
+executor = ThreadPoolExecutor(max_workers=1)
+
+
+def ai_move(ai):
+    """
+    Returns the AI's next move, or None, a message describing it, and,
+    when there are no moves left, a copy of the cells the AI knows to be
+    mines (otherwise None). The copy is taken here, on the AI's thread,
+    since `ai.mines` may be changing under an `add_knowledge` call while
+    the drawing loop runs.
+    """
+    move = ai.make_safe_move()
+    if move is None:
+        move = ai.make_random_move()
+        if move is None:
+            return None, "No moves left to make.", ai.mines.copy()
+        return move, "No known safe moves, AI making random move.", None
+    return move, "AI making safe move.", None
+
+
+def draw_cell(i, j):
+    """
+    Draws cell (i, j) of the board and returns its rectangle.
+    """
+    rect = cells[i][j]
+    pygame.draw.rect(screen, GRAY, rect)
+    pygame.draw.rect(screen, WHITE, rect, 3)
+
+    # Add a mine, flag, or number if needed
+    if game.is_mine((i, j)) and lost:
+        screen.blit(mine, rect)
+    elif (i, j) in flags:
+        screen.blit(flag, rect)
+    elif (i, j) in revealed:
+        neighbors = numbers[game.nearby_mines((i, j))]
+        neighborsTextRect = neighbors.get_rect()
+        neighborsTextRect.center = rect.center
+        screen.blit(neighbors, neighborsTextRect)
+    return rect
+
+
+def draw_button(rect, label):
+    """
+    Draws a button and returns its rectangle.
+    """
+    buttonText = mediumFont.render(label, True, BLACK)
+    buttonRect = buttonText.get_rect()
+    buttonRect.center = rect.center
+    pygame.draw.rect(screen, WHITE, rect)
+    screen.blit(buttonText, buttonRect)
+    return rect
+
+
+def draw_status(text):
+    """
+    Draws the status text and returns the area it occupies.
+    """
+    pygame.draw.rect(screen, BLACK, statusRect)
+    text = mediumFont.render(text, True, WHITE)
+    textRect = text.get_rect()
+    textRect.center = ((5 / 6) * width, (2 / 3) * height)
+    screen.blit(text, textRect)
+    return statusRect
+
 
-# Keep track of revealed cells, flagged cells, and if a mine was hit
-revealed = set()
-flags = set()
-lost = False
+def new_game():
+    """
+    Creates a new game and AI agent, and clears the game state.
+    """
+    global game, ai, revealed, flags, lost, pending
+    game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
+    ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
+
+    # Keep track of revealed cells, flagged cells, and if a mine was hit
+    revealed = set()
+    flags = set()
+    lost = False
+
+    # Move the AI is still computing, if any
+    pending = None
+
+
+new_game()
 
 # Show instructions initially
 instructions = True
 
+# Redraw the whole screen on the next frame, or only cells that changed
+redraw = True
+dirty = set()
+status = None
+
 while True:
+    clock.tick(FPS)
 
-    # Check if game quit
+    # Collect the latest left and right clicks since the last frame
+    left = right = None
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            executor.shutdown(wait=False, cancel_futures=True)
             sys.exit()
-
-    screen.fill(BLACK)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                left = event.pos
+            elif event.button == 3:
+                right = event.pos
 
     # Show game instructions
     if instructions:
 
-        # Title
-        title = largeFont.render("Play Minesweeper", True, WHITE)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-
-        # Rules
-        rules = [
-            "Click a cell to reveal it.",
-            "Right-click a cell to mark it as a mine.",
-            "Mark all mines successfully to win!"
-        ]
-        for i, rule in enumerate(rules):
-            line = smallFont.render(rule, True, WHITE)
-            lineRect = line.get_rect()
-            lineRect.center = ((width / 2), 150 + 30 * i)
-            screen.blit(line, lineRect)
-
         # Play game button
         buttonRect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
-        buttonText = mediumFont.render("Play Game", True, BLACK)
-        buttonTextRect = buttonText.get_rect()
-        buttonTextRect.center = buttonRect.center
-        pygame.draw.rect(screen, WHITE, buttonRect)
-        screen.blit(buttonText, buttonTextRect)
 
-        # Check if play button clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if buttonRect.collidepoint(mouse):
-                instructions = False
-                time.sleep(0.3)
+        if redraw:
+            screen.fill(BLACK)
+
+            # Title
+            title = largeFont.render("Play Minesweeper", True, WHITE)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 50)
+            screen.blit(title, titleRect)
+
+            # Rules
+            rules = [
+                "Click a cell to reveal it.",
+                "Right-click a cell to mark it as a mine.",
+                "Mark all mines successfully to win!"
+            ]
+            for i, rule in enumerate(rules):
+                line = smallFont.render(rule, True, WHITE)
+                lineRect = line.get_rect()
+                lineRect.center = ((width / 2), 150 + 30 * i)
+                screen.blit(line, lineRect)
+
+            draw_button(buttonRect, "Play Game")
+            pygame.display.flip()
+            redraw = False
 
-        pygame.display.flip()
+        # Check if play button clicked
+        if left is not None and buttonRect.collidepoint(left):
+            instructions = False
+            redraw = True
         continue
 
-    # Draw board
-    cells = []
-    for i in range(HEIGHT):
-        row = []
-        for j in range(WIDTH):
-
-            # Draw rectangle for cell
-            rect = pygame.Rect(
-                board_origin[0] + j * cell_size,
-                board_origin[1] + i * cell_size,
-                cell_size, cell_size
-            )
-            pygame.draw.rect(screen, GRAY, rect)
-            pygame.draw.rect(screen, WHITE, rect, 3)
-
-            # Add a mine, flag, or number if needed
-            if game.is_mine((i, j)) and lost:
-                screen.blit(mine, rect)
-            elif (i, j) in flags:
-                screen.blit(flag, rect)
-            elif (i, j) in revealed:
-                neighbors = smallFont.render(
-                    str(game.nearby_mines((i, j))),
-                    True, BLACK
-                )
-                neighborsTextRect = neighbors.get_rect()
-                neighborsTextRect.center = rect.center
-                screen.blit(neighbors, neighborsTextRect)
-
-            row.append(rect)
-        cells.append(row)
-
-    # AI Move button
-    aiButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = mediumFont.render("AI Move", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = aiButton.center
-    pygame.draw.rect(screen, WHITE, aiButton)
-    screen.blit(buttonText, buttonRect)
-
-    # Reset button
-    resetButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 20,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = mediumFont.render("Reset", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = resetButton.center
-    pygame.draw.rect(screen, WHITE, resetButton)
-    screen.blit(buttonText, buttonRect)
-
-    # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
-    text = mediumFont.render(text, True, WHITE)
-    textRect = text.get_rect()
-    textRect.center = ((5 / 6) * width, (2 / 3) * height)
-    screen.blit(text, textRect)
-
     move = None
 
-    left, _, right = pygame.mouse.get_pressed()
-
     # Check for a right-click to toggle flagging
-    if right == 1 and not lost:
-        mouse = pygame.mouse.get_pos()
+    if right is not None and not lost:
         for i in range(HEIGHT):
             for j in range(WIDTH):
-                if cells[i][j].collidepoint(mouse) and (i, j) not in revealed:
+                if cells[i][j].collidepoint(right) and (i, j) not in revealed:
                     if (i, j) in flags:
                         flags.remove((i, j))
                     else:
                         flags.add((i, j))
-                    time.sleep(0.2)
-
-    elif left == 1:
-        mouse = pygame.mouse.get_pos()
-
-        # If AI button clicked, make an AI move
-        if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
-            time.sleep(0.2)
+                    dirty.add((i, j))
+
+    elif left is not None:
+
+        # If AI button clicked, ask the AI for a move unless it is still thinking
+        if aiButton.collidepoint(left) and not lost:
+            if pending is None:
+                pending = executor.submit(ai_move, ai)
 
         # Reset game state
-        elif resetButton.collidepoint(mouse):
-            game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-            revealed = set()
-            flags = set()
-            lost = False
-            continue
+        elif resetButton.collidepoint(left):
+            new_game()
+            redraw = True
 
         # User-made move
         elif not lost:
             for i in range(HEIGHT):
                 for j in range(WIDTH):
-                    if (cells[i][j].collidepoint(mouse)
+                    if (cells[i][j].collidepoint(left)
                             and (i, j) not in flags
                             and (i, j) not in revealed):
                         move = (i, j)
 
+    # Pick up the AI's move once it is ready
+    if pending is not None and pending.done():
+        move, message, mines = pending.result()
+        pending = None
+        print(message)
+        if move in revealed:
+            move = None
+        elif move is None:
+            dirty.update(flags)
+            flags = mines
+            dirty.update(flags)
+
     # Make move and update AI knowledge
-    if move:
+    if move and not lost:
         if game.is_mine(move):
             lost = True
+            dirty.update(game.mines)
+            dirty.add(move)
         else:
             nearby = game.nearby_mines(move)
             revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            dirty.add(move)
+            executor.submit(ai.add_knowledge, move, nearby)
+
+    # Draw only what changed since the last frame
+    updated = []
+    if redraw:
+        screen.fill(BLACK)
+        dirty = set((i, j) for i in range(HEIGHT) for j in range(WIDTH))
+        draw_button(aiButton, "AI Move")
+        draw_button(resetButton, "Reset")
+        status = None
+    for i, j in dirty:
+        updated.append(draw_cell(i, j))
+    dirty = set()
+
+    text = "Lost" if lost else "Won" if game.mines == flags else ""
+    if text != status:
+        updated.append(draw_status(text))
+        status = text
 
-    pygame.display.flip()
+    if redraw:
+        pygame.display.flip()
+        redraw = False
+    elif updated:
+        pygame.display.update(updated)
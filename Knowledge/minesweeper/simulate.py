@@ -0,0 +1,172 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from minesweeper import BitSentence, Minesweeper, MinesweeperAI, Sentence
+
+# Number of buckets game progress is split into when reporting knowledge size
+PROGRESS_BUCKETS = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Minesweeper games between the board and the AI "
+                    "without a display and report speed and strength."
+    )
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--mines", type=int, default=None,
+                        help="number of mines (default: from --density)")
+    parser.add_argument("--density", type=float, default=0.125,
+                        help="fraction of cells that are mines")
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-budget", type=float, default=0.05,
+                        help="seconds the AI may spend on a random move")
+    parser.add_argument("--board", choices=["list", "array"], default="list",
+                        help="board implementation (array requires NumPy)")
+    parser.add_argument("--flood-fill", action="store_true",
+                        help="reveal neighbors of cells with no nearby mines "
+                             "(requires --board array)")
+    parser.add_argument("--bitset", action="store_true",
+                        help="store the AI's sentences as integer bitmasks")
+    args = parser.parse_args()
+
+    mines = args.mines
+    if mines is None:
+        mines = round(args.height * args.width * args.density)
+    if not 0 < mines < args.height * args.width:
+        parser.error("there must be at least one mine and one safe cell")
+    if args.flood_fill and args.board != "array":
+        parser.error("--flood-fill requires --board array")
+
+    games = [
+        (args.height, args.width, mines, args.seed + i, args.time_budget,
+         args.board, args.flood_fill, args.bitset)
+        for i in range(args.games)
+    ]
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        results = list(pool.imap_unordered(play_game, games, chunksize=8))
+    elapsed = time.perf_counter() - start
+
+    report(results, elapsed, args.height, args.width, mines, args.processes)
+
+
+def play_game(settings):
+    """
+    Play one game of Minesweeper with the AI and return its statistics.
+
+    The AI makes a safe move when it knows one and a random move otherwise,
+    as in runner.py. The game is won when every safe cell is revealed, and
+    lost when a mine is revealed. With flood fill, every cell revealed by
+    a move is given to the AI.
+    """
+    (height, width, mines, seed, time_budget,
+     board, flood_fill, bitset) = settings
+    random.seed(seed)
+    if board == "array":
+        import numpy as np
+        from board import ArrayMinesweeper
+        game = ArrayMinesweeper(height=height, width=width, mines=mines,
+                                rng=np.random.default_rng(seed))
+    else:
+        game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines,
+                       time_budget=time_budget,
+                       sentence_class=BitSentence if bitset else Sentence)
+
+    latencies = []
+    knowledge = []
+    propagations = 0
+    random_moves = 0
+    safe_cells = height * width - mines
+    won = False
+    while True:
+        # Time the AI's work for a move: choosing it and learning from it
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            random_moves += 1
+        if move is None or game.is_mine(move):
+            break
+        # ai.propagations only counts the last add_knowledge call, so it is
+        # added up after each one
+        if flood_fill:
+            for cell, count in game.reveal(move, ai.moves_made):
+                ai.add_knowledge(cell, count)
+                propagations += ai.propagations
+        else:
+            ai.add_knowledge(move, game.nearby_mines(move))
+            propagations += ai.propagations
+        latencies.append(time.perf_counter() - start)
+        knowledge.append(len(ai.knowledge))
+        if len(ai.moves_made) == safe_cells:
+            won = True
+            break
+
+    return {
+        "won": won,
+        "latencies": latencies,
+        "knowledge": knowledge,
+        "propagations": propagations,
+        "random_moves": random_moves,
+    }
+
+
+def report(results, elapsed, height, width, mines, processes):
+    """
+    Print win rate, move latency, knowledge base size and throughput.
+    """
+    games = len(results)
+    wins = sum(result["won"] for result in results)
+    latencies = sorted(
+        latency for result in results for latency in result["latencies"]
+    )
+    moves = len(latencies)
+
+    print(f"Board: {height}x{width} with {mines} mines, "
+          f"{games} games on {processes} processes")
+    print(f"Win rate: {wins / games:.2%} ({wins}/{games})")
+    print(f"Moves: {moves} ({moves / games:.1f} per game, "
+          f"{sum(r['random_moves'] for r in results) / games:.1f} random)")
+    if latencies:
+        print("Move latency:")
+        for label, q in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1)]:
+            print(f"  {label}: {percentile(latencies, q) * 1e3:.3f} ms")
+        print(f"Propagations per move: "
+              f"{sum(r['propagations'] for r in results) / moves:.1f}")
+
+    # Knowledge base size over the course of a game, by fraction of moves made
+    print("Knowledge base size (mean / max) by game progress:")
+    buckets = [[] for _ in range(PROGRESS_BUCKETS)]
+    for result in results:
+        sizes = result["knowledge"]
+        for i, size in enumerate(sizes):
+            buckets[i * PROGRESS_BUCKETS // len(sizes)].append(size)
+    for i, sizes in enumerate(buckets):
+        if sizes:
+            low = i * 100 // PROGRESS_BUCKETS
+            high = (i + 1) * 100 // PROGRESS_BUCKETS
+            print(f"  {low:3}-{high:3}%: "
+                  f"{sum(sizes) / len(sizes):8.1f} / {max(sizes)}")
+
+    print(f"Throughput: {games / elapsed:.1f} games/s "
+          f"({elapsed:.2f} s total)")
+
+
+def percentile(values, q):
+    """
+    Return the `q` quantile of sorted `values` by the nearest-rank method.
+    """
+    rank = max(1, min(len(values), math.ceil(q * len(values))))
+    return values[rank - 1]
+
+
+if __name__ == "__main__":
+    main()
@@ -133,9 +133,10 @@ class NimAI:
         `state`, return 0.
         """
         rewards = dict()
-        if not Nim.available_actions(state):
+        actions = Nim.available_actions(state)
+        if not actions:
             return 0
-        for action in Nim.available_actions(state):
+        for action in actions:
             if (tuple(state), tuple(action)) in self.q:
                 rewards[action] = self.q[tuple(state), tuple(action)]
             else:
@@ -158,9 +159,10 @@ class NimAI:
         options is an acceptable return value.
         """
         rewards = dict()
-        if not Nim.available_actions(state):
+        actions = Nim.available_actions(state)
+        if not actions:
             return 0
-        for action in Nim.available_actions(state):
+        for action in actions:
             if (tuple(state), tuple(action)) in self.q:
                 rewards[action] = self.q[tuple(state), tuple(action)]
             else:
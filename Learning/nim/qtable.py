@@ -0,0 +1,135 @@
+import random
+
+import numpy as np
+
+from nim import NimAI
+
+
+class QTable:
+    """
+    Q-values for every (state, action) pair of Nim games starting from
+    `initial`, stored in a dense NumPy array.
+
+    A state (a list of pile sizes) is numbered by reading the piles as the
+    digits of a mixed-radix number, where pile `k` has base
+    `initial[k] + 1`. Action `(i, j)` is numbered `offsets[i] + j - 1`.
+    `actions[s]` lists the actions available in state number `s`, as
+    tuples, and `action_indices[s]` their numbers.
+    """
+
+    def __init__(self, initial=[1, 3, 5, 7]):
+        self.initial = list(initial)
+        self.strides = []
+        stride = 1
+        for pile in self.initial:
+            self.strides.append(stride)
+            stride *= pile + 1
+        self.states = stride
+
+        self.offsets = []
+        offset = 0
+        for pile in self.initial:
+            self.offsets.append(offset)
+            offset += pile
+        self.values = np.zeros((self.states, offset))
+
+        # Actions available in every state, worked out once
+        self.actions = []
+        self.action_indices = []
+        for number in range(self.states):
+            piles = self.decode(number)
+            actions = [
+                (i, j) for i, pile in enumerate(piles) for j in range(1, pile + 1)
+            ]
+            self.actions.append(actions)
+            self.action_indices.append(
+                np.array([self.offsets[i] + j - 1 for i, j in actions],
+                         dtype=np.int64)
+            )
+
+    def encode(self, state):
+        """
+        Return the number of the state with piles `state`.
+        """
+        number = 0
+        for pile, stride, limit in zip(state, self.strides, self.initial):
+            if not 0 <= pile <= limit:
+                raise ValueError(f"pile of {pile} outside this table")
+            number += pile * stride
+        return number
+
+    def decode(self, number):
+        """
+        Return the piles of state number `number`.
+        """
+        return [number // stride % (pile + 1)
+                for stride, pile in zip(self.strides, self.initial)]
+
+    def action_index(self, action):
+        """
+        Return the number of action `(i, j)`.
+        """
+        i, j = action
+        if not 0 <= i < len(self.initial) or not 1 <= j <= self.initial[i]:
+            raise ValueError(f"action {action} outside this table")
+        return self.offsets[i] + j - 1
+
+    def __getitem__(self, key):
+        state, action = key
+        return float(self.values[self.encode(state), self.action_index(action)])
+
+    def __setitem__(self, key, value):
+        state, action = key
+        self.values[self.encode(state), self.action_index(action)] = value
+
+
+class ArrayNimAI(NimAI):
+    """
+    NimAI whose Q-values are held in a QTable instead of a dictionary.
+    Q-values start at 0, as missing entries do in NimAI.
+    """
+
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7]):
+        super().__init__(alpha=alpha, epsilon=epsilon)
+        self.q = QTable(initial)
+
+    def get_q_value(self, state, action):
+        """
+        Return the Q-value for the state `state` and the action `action`.
+        """
+        return self.q[state, action]
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        """
+        Update the Q-value for the state `state` and the action `action`,
+        with the same formula as NimAI.
+        """
+        self.q[state, action] = old_q + self.alpha * (
+            reward + future_rewards - old_q
+        )
+
+    def best_future_reward(self, state):
+        """
+        Return the highest Q-value of any action available in `state`,
+        or 0 if there are none.
+        """
+        number = self.q.encode(state)
+        indices = self.q.action_indices[number]
+        if not len(indices):
+            return 0
+        return float(self.q.values[number, indices].max())
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Return the action with the highest Q-value in `state` or, if
+        `epsilon` is True, a random action with probability
+        `self.epsilon`. Return 0 if there are no actions available.
+        """
+        number = self.q.encode(state)
+        actions = self.q.actions[number]
+        if not actions:
+            return 0
+        if epsilon and random.random() < self.epsilon:
+            return random.choice(actions)
+        best = self.q.values[number, self.q.action_indices[number]].argmax()
+        return actions[best]
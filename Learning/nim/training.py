@@ -0,0 +1,112 @@
+import argparse
+import random
+import time
+
+from nim import play
+from qtable import ArrayNimAI
+
+# Games between progress reports
+PROGRESS_INTERVAL = 100000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train a Nim AI by self-play without printing every game."
+    )
+    parser.add_argument("-n", "--games", type=int, default=None,
+                        help="number of games to train for")
+    parser.add_argument("-s", "--seconds", type=float, default=None,
+                        help="wall-clock time to train for")
+    parser.add_argument("--interval", type=int, default=PROGRESS_INTERVAL,
+                        help="games between progress reports (0 for none)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--play", action="store_true",
+                        help="play against the AI once trained")
+    args = parser.parse_args()
+    if args.games is None and args.seconds is None:
+        parser.error("give a number of games, a time budget, or both")
+
+    random.seed(args.seed)
+    ai, games, elapsed = fast_train(args.games, args.seconds, args.interval)
+    print(f"Trained on {games} games in {elapsed:.2f} s "
+          f"({games / elapsed:.0f} games/s)")
+    if args.play:
+        play(ai)
+
+
+def fast_train(games=None, seconds=None, interval=PROGRESS_INTERVAL, ai=None):
+    """
+    Train an ArrayNimAI (a new one unless `ai` is given) by playing games
+    against itself, as `train` does, until `games` games have been played
+    or `seconds` seconds have passed, whichever comes first.
+
+    Games are played on state and action numbers of the AI's QTable
+    rather than on Nim objects, so a move allocates nothing: the state
+    number goes down by the pile's stride times the count taken, and the
+    last move of each player is kept in two reused lists.
+
+    Every `interval` games, progress and the rate so far are printed.
+
+    Return the AI, the number of games played and the time taken.
+    """
+    if ai is None:
+        ai = ArrayNimAI()
+    q = ai.q
+    values, actions, indices = q.values, q.actions, q.action_indices
+    strides = q.strides
+    start_state = q.encode(q.initial)
+    alpha, epsilon = ai.alpha, ai.epsilon
+
+    def update(state, action, new_state, reward):
+        available = indices[new_state]
+        future = values[new_state, available].max() if len(available) else 0
+        old = values[state, action]
+        values[state, action] = old + alpha * (reward + future - old)
+
+    # State and action numbers of each player's last move
+    last_state = [None, None]
+    last_action = [None, None]
+
+    start = time.perf_counter()
+    deadline = None if seconds is None else start + seconds
+    played = 0
+    while games is None or played < games:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        state = start_state
+        player = 0
+        last_state[0] = last_state[1] = None
+        while True:
+            available = indices[state]
+            if random.random() < epsilon:
+                choice = random.randrange(len(available))
+            else:
+                choice = values[state, available].argmax()
+            action = available[choice]
+            pile, count = actions[state][choice]
+            new_state = state - count * strides[pile]
+
+            last_state[player] = state
+            last_action[player] = action
+            player = 1 - player
+
+            # Whoever takes the last object loses
+            if new_state == 0:
+                update(state, action, new_state, -1)
+                if last_state[player] is not None:
+                    update(last_state[player], last_action[player], new_state, 1)
+                break
+            elif last_state[player] is not None:
+                update(last_state[player], last_action[player], new_state, 0)
+            state = new_state
+
+        played += 1
+        if interval and played % interval == 0:
+            elapsed = time.perf_counter() - start
+            print(f"Played {played} games in {elapsed:.1f} s "
+                  f"({played / elapsed:.0f} games/s)")
+    return ai, played, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import csv
+import glob
+import importlib.util
+import multiprocessing
+import os
+import time
+
+from belief import PedigreeGraph, belief_propagation
+from elimination import variable_elimination
+from pedigree import Pedigree
+from sampling import gibbs_sampling, likelihood_weighting
+from vectorized import vectorized_probabilities
+
+# Largest pedigree with loops that `auto` solves by enumeration; beyond
+# this, variable elimination is faster
+ENUMERATION_LIMIT = 5
+
+COLUMNS = [
+    "family", "person", "method", "seconds",
+    "gene_2", "gene_1", "gene_0", "trait",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run heredity inference on many family CSV files in "
+                    "parallel and write every marginal to one file."
+    )
+    parser.add_argument("paths", nargs="+",
+                        help="family CSV files, directories of them, or globs")
+    parser.add_argument("-o", "--output", default="marginals.csv",
+                        help="output file, written as Parquet if it ends in "
+                             ".parquet (requires pyarrow) and CSV otherwise")
+    parser.add_argument("-m", "--method", choices=["auto"] + sorted(METHODS),
+                        default="auto")
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    parquet = args.output.endswith(".parquet")
+    if parquet and importlib.util.find_spec("pyarrow") is None:
+        parser.error("Parquet output requires pyarrow")
+    filenames = find_families(args.paths)
+    if not filenames:
+        parser.error("no family CSV files found")
+
+    tasks = [(filename, args.method) for filename in filenames]
+    start = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(args.processes) as pool:
+        for result in pool.imap_unordered(infer_family, tasks):
+            filename, method, seconds, probabilities, error = result
+            if error is not None:
+                print(f"{filename}: failed ({error})")
+                continue
+            print(f"{filename}: {len(probabilities)} people, {method}, "
+                  f"{seconds * 1e3:.1f} ms")
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    rows = marginal_rows(sorted(results))
+    if parquet:
+        write_parquet(rows, args.output)
+    else:
+        write_csv(rows, args.output)
+    print(f"Solved {len(results)} of {len(filenames)} families in "
+          f"{elapsed:.2f} s, wrote {len(rows)} rows to {args.output}")
+
+
+def find_families(paths):
+    """
+    Return the sorted family CSV files named by `paths`, each of which is
+    a file, a directory whose CSV files are all used, or a glob pattern.
+    """
+    filenames = set()
+    for path in paths:
+        if os.path.isdir(path):
+            filenames.update(glob.glob(os.path.join(path, "*.csv")))
+        elif os.path.isfile(path):
+            filenames.add(path)
+        else:
+            filenames.update(glob.glob(path, recursive=True))
+    return sorted(filenames)
+
+
+def choose_method(pedigree):
+    """
+    Return the name of the exact method expected to be fastest for
+    `pedigree`: belief propagation for pedigrees without loops, whatever
+    their size, enumeration for very small pedigrees with loops, and
+    variable elimination otherwise.
+    """
+    if PedigreeGraph(pedigree).is_tree():
+        return "belief-propagation"
+    if len(pedigree) <= ENUMERATION_LIMIT:
+        return "enumeration"
+    return "elimination"
+
+
+def infer_family(task):
+    """
+    Load one family file and compute its marginals.
+
+    Return the file name, the method used, the time inference took, the
+    probabilities (in the format built by `heredity.main`), and an error
+    message if the file could not be solved, or None.
+    """
+    filename, method = task
+    try:
+        pedigree = Pedigree.load(filename)
+        if method == "auto":
+            method = choose_method(pedigree)
+        start = time.perf_counter()
+        probabilities = METHODS[method](pedigree)
+        seconds = time.perf_counter() - start
+    except Exception as error:
+        return filename, method, 0.0, None, str(error)
+    return filename, method, seconds, probabilities, None
+
+
+def marginal_rows(results):
+    """
+    Return one row (a list of values in the order of COLUMNS) per person
+    in `results`.
+    """
+    rows = []
+    for filename, method, seconds, probabilities, _ in results:
+        for person in probabilities:
+            gene = probabilities[person]["gene"]
+            rows.append([
+                filename, person, method, seconds,
+                gene[2], gene[1], gene[0], probabilities[person]["trait"][True],
+            ])
+    return rows
+
+
+def write_csv(rows, filename):
+    """
+    Write `rows` to a CSV file with a header row of COLUMNS.
+    """
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def write_parquet(rows, filename):
+    """
+    Write `rows` to a Parquet file, one column per entry of COLUMNS.
+    """
+    import pyarrow
+    import pyarrow.parquet
+    columns = dict(
+        (name, [row[i] for row in rows]) for i, name in enumerate(COLUMNS)
+    )
+    pyarrow.parquet.write_table(pyarrow.table(columns), filename)
+
+
+# Wrappers giving every method the signature of `variable_elimination`
+
+
+def belief(people):
+    return belief_propagation(people)[0]
+
+
+def weighting(people):
+    return likelihood_weighting(people).probabilities
+
+
+def gibbs(people):
+    return gibbs_sampling(people).probabilities
+
+
+METHODS = {
+    "enumeration": vectorized_probabilities,
+    "elimination": variable_elimination,
+    "belief-propagation": belief,
+    "likelihood-weighting": weighting,
+    "gibbs": gibbs,
+}
+
+
+if __name__ == "__main__":
+    main()
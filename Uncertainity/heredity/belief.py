@@ -0,0 +1,256 @@
+import sys
+
+import numpy as np
+
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+# Weight given to the previous message when updating on a loopy pedigree
+DAMPING = 0.5
+
+# Stop sweeping once no message changes by more than this
+TOLERANCE = 1e-10
+MAX_SWEEPS = 200
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python belief.py data.csv")
+    people = load_data(sys.argv[1])
+    probabilities, sweeps, exact = belief_propagation(people)
+    print_probabilities(probabilities)
+    kind = "exact" if exact else "loopy"
+    print(f"({kind} belief propagation, {sweeps} sweeps)")
+
+
+class PedigreeGraph:
+    """
+    Pairwise Markov network for a Pedigree.
+
+    Every person is a node with 3 states (their gene count), and every
+    couple with children together is a node with 9 states (the mother's
+    and father's gene counts, as `3 * mother + father`). Each couple is
+    linked to both parents by an edge that requires the counts to agree,
+    and to each of their children by the inheritance probabilities.
+
+    Joining parents through their couple node means a pedigree without
+    marriages between relatives is a tree, however many children each
+    couple has.
+    """
+
+    def __init__(self, pedigree):
+        n = len(pedigree)
+        self.nodes = []
+        self.unary = []
+        self.neighbors = []
+        # Potential of every directed edge (i, j), as a matrix with one
+        # row per state of i and one column per state of j
+        self.potentials = dict()
+        self.index = dict()
+
+        # Person `i` is node `i`
+        for person in range(n):
+            self.add_node(person, person_potential(pedigree, person))
+
+        # Each couple's gene counts map to the mother's and father's
+        states = np.arange(9)
+        mother_link = (states[:, None] // 3 == np.arange(3)).astype(float)
+        father_link = (states[:, None] % 3 == np.arange(3)).astype(float)
+
+        inheritance = pedigree.inheritance
+        for person in range(n):
+            if pedigree.founders[person]:
+                continue
+            mother = int(pedigree.mothers[person])
+            father = int(pedigree.fathers[person])
+            # A parent missing from the data is treated as having no copies
+            # of the gene, as in `person_factors`
+            if mother == n:
+                self.add_edge(father, person, inheritance[0])
+            elif father == n:
+                self.add_edge(mother, person, inheritance[:, 0])
+            else:
+                couple = (mother, father)
+                if couple not in self.index:
+                    self.add_node(couple, np.ones(9))
+                    self.add_edge(couple, mother, mother_link)
+                    self.add_edge(couple, father, father_link)
+                self.add_edge(couple, person, inheritance.reshape(9, 3))
+
+    def add_node(self, node, unary):
+        self.index[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.unary.append(unary)
+        self.neighbors.append([])
+
+    def add_edge(self, a, b, potential):
+        i, j = self.index[a], self.index[b]
+        self.neighbors[i].append(j)
+        self.neighbors[j].append(i)
+        self.potentials[i, j] = potential
+        self.potentials[j, i] = potential.T
+
+    def is_tree(self):
+        """
+        Return True if the network has no cycles.
+        """
+        edges = len(self.potentials) // 2
+        return edges == len(self.nodes) - len(self.components())
+
+    def components(self):
+        """
+        Return the connected components of the network, each as a list of
+        nodes in breadth-first order from its first node.
+        """
+        seen = set()
+        components = []
+        for root in range(len(self.nodes)):
+            if root in seen:
+                continue
+            seen.add(root)
+            order = [root]
+            for i in order:
+                for j in self.neighbors[i]:
+                    if j not in seen:
+                        seen.add(j)
+                        order.append(j)
+            components.append(order)
+        return components
+
+    def schedule(self):
+        """
+        Return the directed edges in an order that sends every message
+        towards the root of its component and then back out again. On a
+        tree, one pass in this order computes every message exactly.
+        """
+        inward = []
+        for order in self.components():
+            seen = set()
+            for i in order:
+                seen.add(i)
+                for j in self.neighbors[i]:
+                    if j not in seen:
+                        inward.append((j, i))
+        inward.reverse()
+        outward = [(j, i) for i, j in reversed(inward)]
+        return inward + outward
+
+
+def person_potential(pedigree, person):
+    """
+    Return the unary potential of person number `person`'s node: the
+    likelihood of their observed trait, times the prior for founders.
+    """
+    potential = pedigree.likelihood(person)
+    if pedigree.founders[person]:
+        potential = potential * pedigree.prior
+    return potential
+
+
+def send(graph, messages, i, j):
+    """
+    Return the normalized message from node `i` to node `j`: the
+    potential between them applied to `i`'s evidence times every message
+    into `i` except the one from `j`.
+    """
+    incoming = graph.unary[i]
+    for k in graph.neighbors[i]:
+        if k != j:
+            incoming = incoming * messages[k, i]
+    message = incoming @ graph.potentials[i, j]
+    return message / message.sum()
+
+
+def propagate(graph, damping=DAMPING, tolerance=TOLERANCE,
+              max_sweeps=MAX_SWEEPS, messages=None):
+    """
+    Pass messages over `graph`, updating them in place in `messages` (all
+    uniform if not given), and return the messages and number of sweeps.
+
+    On a tree a single sweep, inward to each root and back out, is exact.
+    On a loopy network sweeps repeat until no message changes by more
+    than `tolerance`, each new message being mixed with the old one in
+    proportion `damping` to help convergence.
+    """
+    if messages is None:
+        messages = dict(
+            (edge, np.full(potential.shape[1], 1 / potential.shape[1]))
+            for edge, potential in graph.potentials.items()
+        )
+    schedule = graph.schedule()
+    if graph.is_tree():
+        for i, j in schedule:
+            messages[i, j] = send(graph, messages, i, j)
+        return messages, 1
+
+    for sweep in range(1, max_sweeps + 1):
+        change = 0
+        for i, j in schedule:
+            message = send(graph, messages, i, j)
+            message = (1 - damping) * message + damping * messages[i, j]
+            change = max(change, np.abs(message - messages[i, j]).max())
+            messages[i, j] = message
+        if change < tolerance:
+            break
+    return messages, sweep
+
+
+def update_from(graph, messages, node):
+    """
+    After the unary potential of `node` changes, recompute every message
+    that depends on it, updating `messages` in place, and return how many
+    were sent.
+
+    On a tree those are exactly the messages directed away from `node`,
+    which are sent in breadth-first order from it; messages towards it
+    are unchanged.
+    """
+    sent = 0
+    queue = [(node, None)]
+    for i, previous in queue:
+        for j in graph.neighbors[i]:
+            if j != previous:
+                messages[i, j] = send(graph, messages, i, j)
+                sent += 1
+                queue.append((j, i))
+    return sent
+
+
+def node_belief(graph, messages, i):
+    """
+    Return the normalized belief of node `i`: its evidence times every
+    message into it.
+    """
+    belief = graph.unary[i]
+    for k in graph.neighbors[i]:
+        belief = belief * messages[k, i]
+    return belief / belief.sum()
+
+
+def beliefs(graph, messages):
+    """
+    Return the normalized belief of every node.
+    """
+    return [node_belief(graph, messages, i) for i in range(len(graph.nodes))]
+
+
+def belief_propagation(people, probs=PROBS, damping=DAMPING,
+                       tolerance=TOLERANCE, max_sweeps=MAX_SWEEPS):
+    """
+    Compute every person's gene and trait distribution given the observed
+    traits, by sum-product belief propagation over a PedigreeGraph.
+
+    `people` may be a dictionary as returned by `load_data` or a Pedigree.
+    Return a dictionary in the format built by `heredity.main`, the number
+    of sweeps made, and whether the result is exact (the pedigree has no
+    loops) rather than a loopy approximation.
+    """
+    pedigree = Pedigree.compile(people, probs)
+    graph = PedigreeGraph(pedigree)
+    messages, sweeps = propagate(graph, damping, tolerance, max_sweeps)
+    genes = np.array(beliefs(graph, messages)[:len(pedigree)])
+    return pedigree.to_probabilities(genes), sweeps, graph.is_tree()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import time
+
+from belief import belief_propagation
+from elimination import variable_elimination
+from heredity import enumerate_probabilities, load_data
+from vectorized import vectorized_probabilities
+
+# Largest family that brute-force enumeration is run on
+BRUTE_FORCE_LIMIT = 8
+
+# Largest family that vectorized enumeration is run on
+VECTORIZED_LIMIT = 10
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python benchmark.py data.csv...")
+    for filename in sys.argv[1:]:
+        people = load_data(filename)
+        print(f"{filename}: {len(people)} people")
+
+        results = dict()
+        if len(people) <= BRUTE_FORCE_LIMIT:
+            results["Enumeration"] = timed(enumerate_probabilities, people)
+        if len(people) <= VECTORIZED_LIMIT:
+            results["Vectorized enumeration"] = timed(
+                vectorized_probabilities, people
+            )
+        results["Variable elimination"] = timed(variable_elimination, people)
+        (probabilities, sweeps, exact), elapsed = timed(belief_propagation, people)
+        kind = "exact" if exact else f"loopy, {sweeps} sweeps"
+        results[f"Belief propagation ({kind})"] = probabilities, elapsed
+
+        # Enumeration is the reference when it was run, otherwise variable
+        # elimination, which is also exact
+        reference, _ = next(iter(results.values()))
+        for name, (probabilities, elapsed) in results.items():
+            error = max_difference(reference, probabilities)
+            print(f"    {name}: {elapsed * 1e3:.2f} ms, "
+                  f"max difference {error:.2e}")
+
+
+def timed(function, people):
+    """Returns the result of `function(people)` and the time it took."""
+    start = time.perf_counter()
+    result = function(people)
+    return result, time.perf_counter() - start
+
+
+def max_difference(a, b):
+    """
+    Returns the largest difference between any probability in two
+    dictionaries in the format built by `heredity.main`.
+    """
+    return max(
+        abs(a[person][field][value] - b[person][field][value])
+        for person in a
+        for field in a[person]
+        for value in a[person][field]
+    )
+
+
+if __name__ == "__main__":
+    main()
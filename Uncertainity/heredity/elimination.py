@@ -0,0 +1,220 @@
+import heapq
+import sys
+
+import numpy as np
+
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python elimination.py data.csv")
+    people = load_data(sys.argv[1])
+    print_probabilities(variable_elimination(people))
+
+
+def person_factors(pedigree):
+    """
+    Build one factor per person over gene counts: the probability of their
+    gene count given their parents' (or the prior, for people without
+    parents), times the likelihood of their observed trait.
+
+    A factor is a pair `(variables, table)` where `variables` is a tuple
+    of people's numbers and `table` has one axis of size 3 per variable.
+    A parent missing from the data is treated as having no copies of the
+    gene.
+    """
+    n = len(pedigree)
+    likelihoods = pedigree.likelihoods()
+    factors = []
+    for person in range(n):
+        likelihood = likelihoods[person]
+        mother, father = pedigree.mothers[person], pedigree.fathers[person]
+        if pedigree.founders[person]:
+            factors.append(((person,), pedigree.prior * likelihood))
+            continue
+        # Axes ordered (mother, father, child)
+        table = pedigree.inheritance * likelihood
+        variables = []
+        if mother == n:
+            table = table[0]
+        else:
+            variables.append(int(mother))
+        if father == n:
+            table = table[:, 0]
+        else:
+            variables.append(int(father))
+        factors.append((tuple(variables) + (person,), table))
+    return factors
+
+
+def multiply(factors):
+    """
+    Return the product of `factors` as a single factor (a constant 1 if
+    there are none).
+    """
+    if not factors:
+        return (), np.ones(())
+    variables = []
+    for factor_variables, _ in factors:
+        for variable in factor_variables:
+            if variable not in variables:
+                variables.append(variable)
+    letters = dict((variable, i) for i, variable in enumerate(variables))
+    operands = []
+    for factor_variables, table in factors:
+        operands.append(table)
+        operands.append([letters[variable] for variable in factor_variables])
+    return tuple(variables), np.einsum(*operands, list(range(len(variables))))
+
+
+def sum_out(factor, variable):
+    """
+    Sum `variable` out of `factor`, rescaling the result so that its
+    largest entry is 1. Rescaling keeps products over large families from
+    underflowing, and does not change any normalized marginal.
+    """
+    variables, table = factor
+    axis = variables.index(variable)
+    table = table.sum(axis=axis)
+    top = table.max() if table.size else 0
+    if top > 0:
+        table = table / top
+    return variables[:axis] + variables[axis + 1:], table
+
+
+def min_fill_order(factors, keep=()):
+    """
+    Return an order in which to eliminate every variable except those in
+    `keep`, choosing at each step the variable whose elimination adds the
+    fewest new edges between its neighbors (breaking ties by fewest
+    neighbors).
+    """
+    neighbors = dict()
+    for variables, _ in factors:
+        for variable in variables:
+            neighbors.setdefault(variable, set()).update(variables)
+    for variable in neighbors:
+        neighbors[variable].discard(variable)
+
+    def score(variable):
+        adjacent = list(neighbors[variable])
+        fill = sum(
+            1
+            for i, a in enumerate(adjacent)
+            for b in adjacent[i + 1:]
+            if b not in neighbors[a]
+        )
+        return fill, len(adjacent)
+
+    # Scores are kept in a heap, and stale entries are skipped when popped
+    scores = dict()
+    heap = []
+    for tiebreak, variable in enumerate(neighbors):
+        if variable not in keep:
+            scores[variable] = score(variable)
+            heap.append((scores[variable], tiebreak, variable))
+    heapq.heapify(heap)
+    tiebreaks = dict((entry[2], entry[1]) for entry in heap)
+
+    order = []
+    while heap:
+        current, tiebreak, variable = heapq.heappop(heap)
+        if variable not in scores or scores[variable] != current:
+            continue
+        del scores[variable]
+        order.append(variable)
+        adjacent = neighbors.pop(variable)
+        for a in adjacent:
+            neighbors[a].update(adjacent)
+            neighbors[a].discard(a)
+            neighbors[a].discard(variable)
+        # Only the neighbors of the eliminated variable are rescored, the
+        # usual approximation: other scores can change, but rarely by much
+        for a in adjacent:
+            if a in scores:
+                scores[a] = score(a)
+                heapq.heappush(heap, (scores[a], tiebreaks[a], a))
+    return order
+
+
+def marginalize(factor, keep):
+    """
+    Sum every variable not in `keep` out of `factor`, rescaling the result
+    as `sum_out` does.
+    """
+    variables, table = factor
+    axes = tuple(i for i, variable in enumerate(variables) if variable not in keep)
+    if axes:
+        table = table.sum(axis=axes)
+        top = table.max() if table.size else 0
+        if top > 0:
+            table = table / top
+    return tuple(v for v in variables if v in keep), table
+
+
+def bucket_marginals(factors, order):
+    """
+    Return a dictionary mapping every variable in `order` (which must
+    contain every variable of `factors`) to its normalized marginal.
+
+    Eliminating the variables in `order` builds a bucket tree: each factor
+    waits in the bucket of the first of its variables to be eliminated,
+    and summing a bucket's variable out of the product of its contents
+    sends a message up to the bucket of the next variable it mentions.
+    A second pass back down the tree then sends every bucket the product
+    of everything outside its subtree, so that each variable's marginal
+    comes from its own bucket, all from one elimination order.
+    """
+    position = dict((variable, i) for i, variable in enumerate(order))
+    local = [[] for _ in order]
+    for factor in factors:
+        local[min(position[v] for v in factor[0])].append(factor)
+
+    # Upward pass: ordinary bucket elimination, keeping the messages
+    children = [[] for _ in order]
+    up = [None] * len(order)
+    for i, variable in enumerate(order):
+        message = sum_out(
+            multiply(local[i] + [up[c] for c in children[i]]), variable
+        )
+        if message[0]:
+            up[i] = message
+            children[min(position[v] for v in message[0])].append(i)
+
+    # Downward pass: parents come later in `order` than their children
+    down = [None] * len(order)
+    marginals = dict()
+    for i in reversed(range(len(order))):
+        incoming = local[i] + ([down[i]] if down[i] is not None else [])
+        _, table = marginalize(
+            multiply(incoming + [up[c] for c in children[i]]), {order[i]}
+        )
+        marginals[order[i]] = table / table.sum()
+        for c in children[i]:
+            others = incoming + [up[d] for d in children[i] if d != c]
+            down[c] = marginalize(multiply(others), set(up[c][0]))
+    return marginals
+
+
+def variable_elimination(people, probs=PROBS):
+    """
+    Compute every person's gene and trait distribution given the observed
+    traits, by variable elimination over per-person factors.
+
+    One elimination order is chosen for everyone by the min-fill
+    heuristic, and every person's distribution is read off a bucket tree
+    calibrated with one pass up and one pass down.
+
+    `people` may be a dictionary as returned by `load_data` or a Pedigree.
+    Return a dictionary in the format built by `heredity.main`.
+    """
+    pedigree = Pedigree.compile(people, probs)
+    factors = person_factors(pedigree)
+    marginals = bucket_marginals(factors, min_fill_order(factors))
+    genes = np.array([marginals[person] for person in range(len(pedigree))])
+    return pedigree.to_probabilities(genes)
+
+if __name__ == "__main__":
+    main()
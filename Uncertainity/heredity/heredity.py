@@ -43,6 +43,21 @@ def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
+    probabilities = enumerate_probabilities(people)
+
+    # Print results
+    print_probabilities(probabilities)
+
+
+def enumerate_probabilities(people):
+    """
+    Compute every person's gene and trait distribution by summing the
+    joint probability of every assignment consistent with the evidence.
+
+    Gene assignments are generated lazily, and unobserved traits are
+    marginalized analytically instead of enumerated, so there are 3^n
+    assignments to visit rather than 6^n.
+    """
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -60,34 +75,35 @@ def main():
     }
     # probabilities is now a dictionary. The dictionary contains the name of each person and the probabilities
     # of finding 0, 1, or 2 genes and the probabilities of finding the trait or not finding the trait.
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    # names contains the keys of the dictionary people which are the names of the people
-    for have_trait in powerset(names):
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-        # people is a dictionary contaiining the names of all the people, their mother, father and whether or not the trait is presentin them
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-                # Update probabilities with new joint probability
-                # Loops and gets probabilities where each person is checked for having 1 or 2 genes.
-                # Those not in one_genes or two_genes should be tested for having 0 genes.
-                # have_trait is a set of people who we want to calculate have the trait. It starts with an empty set and then adds people to it. 
-                # Initially 1 person, then 2 and so on until we have to calculate the probability that all exhibit the trait
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    transferprobability = transfer_probabilities()
+    # Only gene assignments are enumerated. Observed traits are fixed, and each unobserved trait is
+    # summed out on the spot: P(genes, evidence) * P(trait | genes) for both values of the trait
+    for one_gene, two_genes in gene_assignments(people):
+        p = 1
+        for person in people:
+            genes = 2 * (person in two_genes) + (person in one_gene)
+            p *= gene_probability(people, person, one_gene, two_genes, transferprobability)
+            if people[person]["trait"] is not None:
+                p *= PROBS["trait"][genes][people[person]["trait"]]
+        for person in people:
+            genes = 2 * (person in two_genes) + (person in one_gene)
+            probabilities[person]["gene"][genes] += p
+            trait = people[person]["trait"]
+            if trait is not None:
+                probabilities[person]["trait"][trait] += p
+            else:
+                probabilities[person]["trait"][True] += p * PROBS["trait"][genes][True]
+                probabilities[person]["trait"][False] += p * PROBS["trait"][genes][False]
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
 
-    # Print results
-    for person in people:
+
+def print_probabilities(probabilities):
+    """
+    Print the gene and trait distribution of every person.
+    """
+    for person in probabilities:
         print(f"{person}:")
         for field in probabilities[person]:
             print(f"  {field.capitalize()}:")
@@ -130,6 +146,18 @@ def powerset(s):
     ]
 
 
+def gene_assignments(people):
+    """
+    Generate every (one_gene, two_genes) pair of disjoint sets of people,
+    one at a time.
+    """
+    names = list(people)
+    for copies in itertools.product((0, 1, 2), repeat=len(names)):
+        one_gene = set(name for name, n in zip(names, copies) if n == 1)
+        two_genes = set(name for name, n in zip(names, copies) if n == 2)
+        yield one_gene, two_genes
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
@@ -146,6 +174,19 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     # two_genes is a set of people who we want to calculate have 2 genes.
     # have_trait is a set of people who we want to calculate have the trait.
     probability = 1
+    transferprobability = transfer_probabilities()
+    for person in people:
+        probability *= gene_probability(people, person, one_gene, two_genes, transferprobability)
+        # Multiply by probability of showing trait given number of genes
+        probability *= PROBS["trait"][2 * (person in two_genes) + (person in one_gene)][person in have_trait]
+    return probability 
+
+
+def transfer_probabilities():
+    """
+    Return a dictionary mapping a parent score (see below) to the
+    probability that a child has 0, 1 or 2 copies of the gene.
+    """
     # passingprobability is the probability that given a person has 0,1 or 2 genes, they will pass 0,1 or 2 genes to their child
     passingprobability = {
         0: {
@@ -201,24 +242,27 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     # 3 -> One parent has two genes and the other has no genes
     # 4 -> One parent has one gene and the other has two genes
     # 6 -> Both parents have two genes
-    for person in people:
-        mother, father = people[person]["mother"], people[person]["father"]
-        if mother is None and father is None:
-            probability *= PROBS["gene"][2 * (person in two_genes) + (person in one_gene)]
-        else:
-            score = 0
-            if mother in two_genes:
-                score += 3
-            elif mother in one_gene:
-                score += 1
-            if father in two_genes:
-                score += 3
-            elif father in one_gene:
-                score += 1
-            probability *= transferprobability[score][2 * (person in two_genes) + (person in one_gene)]
-        # Multiply by probability of showing trait given number of genes
-        probability *= PROBS["trait"][2 * (person in two_genes) + (person in one_gene)][person in have_trait]
-    return probability 
+    return transferprobability
+
+
+def gene_probability(people, person, one_gene, two_genes, transferprobability):
+    """
+    Return the probability that `person` has the number of copies of the
+    gene given by `one_gene` and `two_genes`, given their parents' copies.
+    """
+    mother, father = people[person]["mother"], people[person]["father"]
+    if mother is None and father is None:
+        return PROBS["gene"][2 * (person in two_genes) + (person in one_gene)]
+    score = 0
+    if mother in two_genes:
+        score += 3
+    elif mother in one_gene:
+        score += 1
+    if father in two_genes:
+        score += 3
+    elif father in one_gene:
+        score += 1
+    return transferprobability[score][2 * (person in two_genes) + (person in one_gene)]
 
 
 def update(probabilities, one_gene, two_genes, have_trait, p):
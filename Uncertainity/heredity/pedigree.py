@@ -0,0 +1,217 @@
+import numpy as np
+
+from heredity import PROBS, load_data
+
+# Value of `Pedigree.evidence` for a person whose trait is not observed
+UNOBSERVED = -1
+
+
+def gene_prior(probs=PROBS):
+    """
+    Return the probability of having 0, 1 or 2 copies of the gene,
+    for a person with no parents in the data.
+    """
+    return np.array([probs["gene"][0], probs["gene"][1], probs["gene"][2]])
+
+
+def inheritance_table(probs=PROBS):
+    """
+    Return an array `table` where `table[m, f, c]` is the probability
+    that a child has `c` copies of the gene given that their mother
+    has `m` copies and their father has `f` copies.
+    """
+    mutation = probs["mutation"]
+    # Probability that a parent with 0, 1 or 2 copies passes the gene on
+    passing = [mutation, 0.5, 1 - mutation]
+    table = np.zeros((3, 3, 3))
+    for m in range(3):
+        for f in range(3):
+            pm, pf = passing[m], passing[f]
+            table[m, f] = [
+                (1 - pm) * (1 - pf),
+                pm * (1 - pf) + (1 - pm) * pf,
+                pm * pf,
+            ]
+    return table
+
+
+def trait_table(probs=PROBS):
+    """
+    Return an array `table` where `table[g, t]` is the probability of
+    showing the trait (`t` = 1) or not (`t` = 0) given `g` copies of the gene.
+    """
+    return np.array([
+        [probs["trait"][g][False], probs["trait"][g][True]] for g in range(3)
+    ])
+
+
+class Pedigree:
+    """
+    Array form of a pedigree and the probabilities of the heredity model.
+
+    People are numbered 0..n-1 in the order of `names`. `mothers[i]` and
+    `fathers[i]` are the numbers of person `i`'s parents, or `n` for a
+    parent missing from the data, meant to index an extra column that
+    always holds no copies of the gene. `evidence[i]` is 1 or 0 for an
+    observed trait and UNOBSERVED otherwise. `order` lists everyone with
+    parents before their children.
+
+    The model's tables are `prior[g]`, `inheritance[m, f, c]` and
+    `traits[g, t]`, as built by `gene_prior`, `inheritance_table` and
+    `trait_table`.
+    """
+
+    def __init__(self, names, mothers, fathers, evidence, probs=PROBS):
+        self.names = list(names)
+        self.index = dict((name, i) for i, name in enumerate(self.names))
+        self.mothers = np.asarray(mothers, dtype=np.int64)
+        self.fathers = np.asarray(fathers, dtype=np.int64)
+        self.evidence = np.asarray(evidence, dtype=np.int8)
+        self.founders = (self.mothers == len(self)) & (self.fathers == len(self))
+        self.order = self.topological_order()
+
+        self.prior = gene_prior(probs)
+        self.inheritance = inheritance_table(probs)
+        self.traits = trait_table(probs)
+
+    @classmethod
+    def from_people(cls, people, probs=PROBS):
+        """
+        Build a pedigree from a dictionary as returned by `load_data`.
+        """
+        names = list(people)
+        index = dict((name, i) for i, name in enumerate(names))
+        missing = len(names)
+        mothers = [index.get(people[name]["mother"], missing) for name in names]
+        fathers = [index.get(people[name]["father"], missing) for name in names]
+        evidence = [
+            UNOBSERVED if people[name]["trait"] is None else int(people[name]["trait"])
+            for name in names
+        ]
+        return cls(names, mothers, fathers, evidence, probs)
+
+    @classmethod
+    def compile(cls, people, probs=PROBS):
+        """
+        Return `people` if it is already a Pedigree, and otherwise build
+        one from the dictionary returned by `load_data`.
+        """
+        if isinstance(people, cls):
+            return people
+        return cls.from_people(people, probs)
+
+    @classmethod
+    def load(cls, filename, probs=PROBS):
+        """
+        Build a pedigree from a CSV file in the format read by `load_data`.
+        """
+        return cls.from_people(load_data(filename), probs)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def observed(self):
+        """
+        Boolean mask of the people whose trait is observed.
+        """
+        return self.evidence != UNOBSERVED
+
+    def set_evidence(self, person, trait):
+        """
+        Record person number `person`'s trait as observed (True or False),
+        or as unobserved if `trait` is None.
+        """
+        self.evidence[person] = UNOBSERVED if trait is None else int(trait)
+
+    def likelihood(self, person):
+        """
+        Return the probability of person number `person`'s observed trait
+        given 0, 1 or 2 copies of the gene (1 if unobserved).
+        """
+        if self.evidence[person] == UNOBSERVED:
+            return np.ones(3)
+        return self.traits[:, self.evidence[person]]
+
+    def topological_order(self):
+        """
+        Return an array of everyone's number, parents before children.
+        """
+        n = len(self)
+        order = []
+        placed = np.zeros(n + 1, dtype=bool)
+        # The missing-parent column counts as already placed
+        placed[n] = True
+        for person in range(n):
+            stack = [person]
+            while stack:
+                i = stack[-1]
+                if placed[i]:
+                    stack.pop()
+                    continue
+                parents = [
+                    p for p in (self.mothers[i], self.fathers[i]) if not placed[p]
+                ]
+                if parents:
+                    stack.extend(parents)
+                else:
+                    placed[i] = True
+                    order.append(i)
+                    stack.pop()
+        return np.array(order, dtype=np.int64)
+
+    def likelihoods(self):
+        """
+        Return an n x 3 array of the probability of everyone's observed
+        trait given 0, 1 or 2 copies of the gene (1 where unobserved).
+        """
+        likelihoods = np.ones((len(self), 3))
+        observed = self.observed
+        likelihoods[observed] = self.traits[:, self.evidence[observed]].T
+        return likelihoods
+
+    def children(self):
+        """
+        Return, for everyone, a list of (child, other parent, is mother)
+        for each of their children.
+        """
+        n = len(self)
+        children = [[] for _ in range(n)]
+        for c in range(n):
+            if self.mothers[c] < n:
+                children[self.mothers[c]].append((c, self.fathers[c], True))
+            if self.fathers[c] < n:
+                children[self.fathers[c]].append((c, self.mothers[c], False))
+        return children
+
+    def to_probabilities(self, genes, has_trait=None):
+        """
+        Return a dictionary in the format built by `heredity.main` from
+        `genes`, an n x 3 array of everyone's distribution over 0, 1 and 2
+        copies of the gene, and optionally `has_trait`, everyone's
+        probability of showing the trait. Without it, unobserved traits
+        get the distribution the gene counts imply.
+        """
+        genes = np.asarray(genes)
+        if has_trait is None:
+            has_trait = genes @ self.traits[:, 1]
+        return dict(
+            (name, self.to_distribution(i, genes[i], has_trait[i]))
+            for i, name in enumerate(self.names)
+        )
+
+    def to_distribution(self, person, genes, has_trait=None):
+        """
+        Return the gene and trait distribution of person number `person`,
+        in the format of one entry of `to_probabilities`, from their gene
+        distribution `genes` and optionally their probability of showing
+        the trait.
+        """
+        if self.evidence[person] != UNOBSERVED:
+            has_trait = float(self.evidence[person])
+        elif has_trait is None:
+            has_trait = genes @ self.traits[:, 1]
+        return {
+            "gene": {2: float(genes[2]), 1: float(genes[1]), 0: float(genes[0])},
+            "trait": {True: float(has_trait), False: float(1 - has_trait)},
+        }
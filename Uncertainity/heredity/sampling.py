@@ -0,0 +1,269 @@
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+from heredity import PROBS, load_data
+from pedigree import Pedigree
+
+# Stop once every estimated probability has a standard error below this
+PRECISION = 0.005
+
+# Likelihood weighting: samples drawn at a time, and at most in total
+BATCH_SIZE = 10000
+MAX_SAMPLES = 10000000
+
+# Effective sample size needed before standard errors are trusted, since
+# with few samples carrying most of the weight they are badly understated
+MIN_EFFECTIVE_SAMPLES = 1000
+
+# Gibbs sampling: chains run side by side, sweeps discarded at the start
+# of each chain, sweeps between precision checks, and at most in total
+CHAINS = 64
+BURN_IN = 100
+CHECK_INTERVAL = 50
+MAX_SWEEPS = 20000
+
+Estimate = namedtuple(
+    "Estimate", ["probabilities", "errors", "samples", "converged"]
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate gene and trait probabilities by sampling."
+    )
+    parser.add_argument("data")
+    parser.add_argument("-m", "--method", choices=sorted(SAMPLERS),
+                        default="likelihood-weighting")
+    parser.add_argument("--precision", type=float, default=PRECISION)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    people = load_data(args.data)
+    estimate = SAMPLERS[args.method](people, precision=args.precision,
+                                     seed=args.seed)
+    for person in estimate.probabilities:
+        print(f"{person}:")
+        for field in estimate.probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in estimate.probabilities[person][field]:
+                p = estimate.probabilities[person][field][value]
+                error = estimate.errors[person][field][value]
+                print(f"    {value}: {p:.4f} ± {error:.4f}")
+    status = "reached" if estimate.converged else "not reached"
+    print(f"({estimate.samples} samples, precision {args.precision} {status})")
+
+
+def sample_categorical(rng, probabilities):
+    """
+    Draw one value from each row of `probabilities`, an array of
+    distributions over 0, 1 and 2.
+    """
+    cumulative = np.cumsum(probabilities, axis=-1)
+    u = rng.random(cumulative.shape[:-1] + (1,)) * cumulative[..., -1:]
+    return (cumulative[..., :-1] < u).sum(axis=-1)
+
+
+def forward_sample(rng, pedigree, size):
+    """
+    Draw `size` gene assignments from the prior, parents before children.
+    Return them as the rows of an array with one column per person and
+    a last column of zeros for missing parents.
+    """
+    n = len(pedigree)
+    genes = np.zeros((size, n + 1), dtype=int)
+    for i in pedigree.order:
+        if pedigree.founders[i]:
+            distributions = np.broadcast_to(pedigree.prior, (size, 3))
+        else:
+            distributions = pedigree.inheritance[
+                genes[:, pedigree.mothers[i]], genes[:, pedigree.fathers[i]]
+            ]
+        genes[:, i] = sample_categorical(rng, distributions)
+    return genes
+
+
+def quantities(genes_or_distributions, traits):
+    """
+    Return, per sample and person, the 3 gene-count indicators (or
+    probabilities) followed by the implied probability of the trait.
+    """
+    if genes_or_distributions.ndim == 2:
+        distributions = np.eye(3)[genes_or_distributions]
+    else:
+        distributions = genes_or_distributions
+    return np.concatenate(
+        [distributions, distributions @ traits[:, 1:]], axis=-1
+    )
+
+
+def to_estimate(pedigree, means, errors, samples, converged):
+    """
+    Return an Estimate from per-person `means` and standard `errors` of
+    the quantities built by `quantities`.
+    """
+    probabilities = pedigree.to_probabilities(means[:, :3], means[:, 3])
+    errors_by_person = dict()
+    for i, name in enumerate(pedigree.names):
+        # Observed traits are known exactly
+        trait_error = 0.0 if pedigree.observed[i] else float(errors[i, 3])
+        errors_by_person[name] = {
+            "gene": {
+                2: float(errors[i, 2]),
+                1: float(errors[i, 1]),
+                0: float(errors[i, 0]),
+            },
+            "trait": {True: trait_error, False: trait_error},
+        }
+    return Estimate(probabilities, errors_by_person, samples, converged)
+
+
+def likelihood_weighting(people, probs=PROBS, precision=PRECISION,
+                         batch_size=BATCH_SIZE, max_samples=MAX_SAMPLES,
+                         min_effective_samples=MIN_EFFECTIVE_SAMPLES,
+                         seed=None):
+    """
+    Estimate every person's gene and trait distribution by likelihood
+    weighting: gene counts are sampled forward from the founders, and each
+    sample is weighted by the likelihood of the observed traits.
+
+    Samples are drawn `batch_size` at a time, as arrays, until every
+    estimate's standard error is below `precision` (with an effective
+    sample size of at least `min_effective_samples`) or `max_samples`
+    samples have been drawn.
+
+    `people` may be a dictionary as returned by `load_data` or a Pedigree.
+    Return an Estimate.
+    """
+    pedigree = Pedigree.compile(people, probs)
+    rng = np.random.default_rng(seed)
+    n = len(pedigree)
+    log_likelihoods = np.log(pedigree.likelihoods())
+
+    # Weighted sums kept relative to exp(shift) so weights cannot
+    # underflow however much evidence there is
+    shift = None
+    weight_sum = weight_square_sum = 0.0
+    sums = np.zeros((n, 4))
+    square_sums = np.zeros((n, 4))
+    cross_sums = np.zeros((n, 4))
+    samples = 0
+    converged = False
+    while samples < max_samples and not converged:
+        size = min(batch_size, max_samples - samples)
+        genes = forward_sample(rng, pedigree, size)[:, :n]
+        log_weights = log_likelihoods[np.arange(n), genes].sum(axis=1)
+
+        batch_shift = log_weights.max()
+        if shift is None or batch_shift > shift:
+            if shift is not None:
+                scale = np.exp(shift - batch_shift)
+                weight_sum *= scale
+                sums *= scale
+                weight_square_sum *= scale ** 2
+                square_sums *= scale ** 2
+                cross_sums *= scale ** 2
+            shift = batch_shift
+        weights = np.exp(log_weights - shift)
+        values = quantities(genes, pedigree.traits)
+
+        weight_sum += weights.sum()
+        weight_square_sum += (weights ** 2).sum()
+        sums += np.einsum("s,snk->nk", weights, values)
+        cross_sums += np.einsum("s,snk->nk", weights ** 2, values)
+        square_sums += np.einsum("s,snk->nk", weights ** 2, values ** 2)
+        samples += size
+
+        # Standard error of a ratio of weighted sums (delta method)
+        means = sums / weight_sum
+        variances = (square_sums - 2 * means * cross_sums
+                     + means ** 2 * weight_square_sum) / weight_sum ** 2
+        errors = np.sqrt(np.clip(variances, 0, None))
+        effective_samples = weight_sum ** 2 / weight_square_sum
+        converged = (effective_samples >= min_effective_samples
+                     and errors.max() < precision)
+    return to_estimate(pedigree, means, errors, samples, converged)
+
+
+def gibbs_sampling(people, probs=PROBS, precision=PRECISION, chains=CHAINS,
+                   burn_in=BURN_IN, check_interval=CHECK_INTERVAL,
+                   max_sweeps=MAX_SWEEPS, seed=None):
+    """
+    Estimate every person's gene and trait distribution by Gibbs sampling,
+    running `chains` chains side by side as the rows of an array.
+
+    Each sweep resamples every person's gene count in turn from its
+    distribution given their parents', children's and co-parents' counts
+    and their observed trait. Estimates average those distributions
+    rather than the sampled counts, which lowers their variance.
+
+    After `burn_in` sweeps, every `check_interval` sweeps the standard
+    error across chains is checked, stopping once every estimate's is
+    below `precision` or after `max_sweeps` sweeps.
+
+    `people` may be a dictionary as returned by `load_data` or a Pedigree.
+    Return an Estimate.
+    """
+    if max_sweeps <= burn_in:
+        raise ValueError("max_sweeps must be greater than burn_in")
+    pedigree = Pedigree.compile(people, probs)
+    rng = np.random.default_rng(seed)
+    n = len(pedigree)
+    mothers, fathers, founders = (
+        pedigree.mothers, pedigree.fathers, pedigree.founders
+    )
+    prior, inheritance = pedigree.prior, pedigree.inheritance
+    likelihoods = pedigree.likelihoods()
+    children = pedigree.children()
+
+    # Start every chain from a forward sample of the prior
+    genes = forward_sample(rng, pedigree, chains)
+
+    counts = np.arange(3)
+    sums = np.zeros((chains, n, 3))
+    kept = 0
+    converged = False
+    for sweep in range(1, max_sweeps + 1):
+        for i in pedigree.order:
+            if founders[i]:
+                conditional = np.broadcast_to(prior, (chains, 3)) * likelihoods[i]
+            else:
+                conditional = (
+                    inheritance[genes[:, mothers[i]], genes[:, fathers[i]]]
+                    * likelihoods[i]
+                )
+            for c, other, is_mother in children[i]:
+                child = genes[:, c, None]
+                if is_mother:
+                    conditional = conditional * inheritance[
+                        counts, genes[:, other, None], child
+                    ]
+                else:
+                    conditional = conditional * inheritance[
+                        genes[:, other, None], counts, child
+                    ]
+            conditional = conditional / conditional.sum(axis=1, keepdims=True)
+            if sweep > burn_in:
+                sums[:, i] += conditional
+            genes[:, i] = sample_categorical(rng, conditional)
+        if sweep > burn_in:
+            kept += 1
+        if kept and (kept % check_interval == 0 or sweep == max_sweeps):
+            values = quantities(sums / kept, pedigree.traits)
+            means = values.mean(axis=0)
+            errors = values.std(axis=0, ddof=1) / np.sqrt(chains)
+            converged = errors.max() < precision
+            if converged:
+                break
+    return to_estimate(pedigree, means, errors, kept * chains, converged)
+
+
+SAMPLERS = {
+    "likelihood-weighting": likelihood_weighting,
+    "gibbs": gibbs_sampling,
+}
+
+
+if __name__ == "__main__":
+    main()
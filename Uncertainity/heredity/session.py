@@ -0,0 +1,111 @@
+import sys
+import time
+
+from belief import (
+    DAMPING, MAX_SWEEPS, TOLERANCE,
+    PedigreeGraph, node_belief, person_potential, propagate, update_from
+)
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python session.py data.csv")
+    session = InferenceSession(load_data(sys.argv[1]))
+    print_probabilities(session.probabilities())
+
+    # Each line names a person and their trait: 1, 0, or nothing to clear it
+    print("Enter updates as: name [1|0]")
+    for line in sys.stdin:
+        fields = line.split()
+        if not fields:
+            continue
+        person = fields[0]
+        if person not in session.pedigree.index:
+            print(f"Unknown person {person}")
+            continue
+        trait = None if len(fields) == 1 else fields[1] == "1"
+        start = time.perf_counter()
+        session.set_evidence(person, trait)
+        elapsed = time.perf_counter() - start
+        print_probabilities(session.probabilities())
+        print(f"(updated in {elapsed * 1e3:.2f} ms, "
+              f"{session.messages_sent} messages sent)")
+
+
+class InferenceSession:
+    """
+    Gene and trait distributions for a pedigree whose observed traits
+    change one person at a time.
+
+    The session compiles the pedigree and its belief-propagation network
+    once, and keeps the messages between updates. Changing one person's
+    evidence on a pedigree without loops resends only the messages
+    directed away from that person. On a loopy pedigree, propagation
+    restarts from the previous messages, which are usually close to the
+    new ones. Distributions are computed from the messages when asked for.
+
+    A Pedigree passed in is used directly, so its evidence changes with
+    the session's.
+    """
+
+    def __init__(self, people, probs=PROBS, damping=DAMPING,
+                 tolerance=TOLERANCE, max_sweeps=MAX_SWEEPS):
+        self.pedigree = Pedigree.compile(people, probs)
+        self.graph = PedigreeGraph(self.pedigree)
+        self.exact = self.graph.is_tree()
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_sweeps = max_sweeps
+        self.messages, _ = propagate(self.graph, damping, tolerance, max_sweeps)
+        # Number of messages computed by the last update
+        self.messages_sent = len(self.messages)
+
+    def set_evidence(self, person, trait):
+        """
+        Record `person`'s trait as observed (True or False), or as
+        unobserved if `trait` is None, and update the messages.
+        """
+        i = self.pedigree.index[person]
+        current = self.pedigree.evidence[i]
+        self.pedigree.set_evidence(i, trait)
+        if self.pedigree.evidence[i] == current:
+            self.messages_sent = 0
+            return
+        self.graph.unary[i] = person_potential(self.pedigree, i)
+        if self.exact:
+            self.messages_sent = update_from(self.graph, self.messages, i)
+        else:
+            _, sweeps = propagate(self.graph, self.damping, self.tolerance,
+                                  self.max_sweeps, messages=self.messages)
+            self.messages_sent = sweeps * len(self.messages)
+
+    def clear_evidence(self, person):
+        """
+        Record `person`'s trait as unobserved.
+        """
+        self.set_evidence(person, None)
+
+    def marginal(self, person):
+        """
+        Return `person`'s gene and trait distribution, in the format of
+        one entry of the dictionary built by `heredity.main`.
+        """
+        i = self.pedigree.index[person]
+        return self.pedigree.to_distribution(
+            i, node_belief(self.graph, self.messages, i)
+        )
+
+    def probabilities(self):
+        """
+        Return everyone's gene and trait distribution, in the format built
+        by `heredity.main`.
+        """
+        return dict(
+            (person, self.marginal(person)) for person in self.pedigree.names
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import sys
+
+import numpy as np
+
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+# Joint probabilities held in memory at a time
+CHUNK_SIZE = 1 << 20
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python vectorized.py data.csv")
+    people = load_data(sys.argv[1])
+    print_probabilities(vectorized_probabilities(people))
+
+
+def assignments(n, values, start=0, stop=None):
+    """
+    Return an array with one row per assignment of one of `values` values
+    to each of `n` people, for assignments numbered `start` to `stop`,
+    reading each number in base `values` with person 0 as the last digit.
+    """
+    stop = values ** n if stop is None else stop
+    numbers = np.arange(start, stop)
+    return numbers[:, None] // values ** np.arange(n) % values
+
+
+def vectorized_probabilities(people, probs=PROBS, chunk_size=CHUNK_SIZE):
+    """
+    Compute every person's gene and trait distribution by summing the
+    joint probability of every assignment consistent with the evidence,
+    as `heredity.enumerate_probabilities` does, but evaluating whole
+    batches of assignments with NumPy.
+
+    Gene and trait assignments are rows of integer arrays. Each batch of
+    gene assignments is combined with every trait assignment that agrees
+    with the observed traits, and the joint probabilities are summed
+    straight into per-person totals.
+
+    `people` may be a dictionary as returned by `load_data` or a Pedigree.
+    """
+    pedigree = Pedigree.compile(people, probs)
+    n = len(pedigree)
+    mothers, fathers = pedigree.mothers, pedigree.fathers
+    prior, inheritance, traits = (
+        pedigree.prior, pedigree.inheritance, pedigree.traits
+    )
+
+    # Only trait assignments that agree with the evidence
+    have_trait = assignments(n, 2)
+    observed = pedigree.observed
+    have_trait = have_trait[
+        (have_trait[:, observed] == pedigree.evidence[observed]).all(axis=1)
+    ]
+
+    gene_totals = np.zeros((n, 3))
+    trait_totals = np.zeros((n, 2))
+    rows = max(1, chunk_size // len(have_trait))
+    for start in range(0, 3 ** n, rows):
+        genes = assignments(n, 3, start, min(start + rows, 3 ** n))
+        padded = np.hstack([genes, np.zeros((len(genes), 1), dtype=int)])
+
+        # Probability of each gene assignment, one person at a time
+        gene_probability = np.where(
+            pedigree.founders,
+            prior[genes],
+            inheritance[padded[:, mothers], padded[:, fathers], genes],
+        ).prod(axis=1)
+
+        # Probability of each trait assignment given each gene assignment
+        joint = gene_probability[:, None] * traits[
+            genes[:, None, :], have_trait[None, :, :]
+        ].prod(axis=2)
+
+        # Accumulate each person's totals from the row and column sums
+        gene_sums = joint.sum(axis=1)
+        trait_sums = joint.sum(axis=0)
+        for i in range(n):
+            gene_totals[i] += np.bincount(genes[:, i], weights=gene_sums,
+                                          minlength=3)
+            trait_totals[i] += np.bincount(have_trait[:, i],
+                                           weights=trait_sums, minlength=2)
+
+    gene_totals /= gene_totals.sum(axis=1, keepdims=True)
+    trait_totals /= trait_totals.sum(axis=1, keepdims=True)
+    return pedigree.to_probabilities(gene_totals, trait_totals[:, 1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from crawler import WORKERS, extract_links
+from pagerank import DAMPING
+from sparse import LinkGraph, power_iteration
+
+# Cache file name, stored in the corpus directory unless given
+CACHE_FILE = ".pagerank-cache.json"
+
+# Version of the cache format; caches with another version are ignored
+VERSION = 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute PageRank, re-parsing only pages that changed "
+                    "since the last run and starting from the last ranks."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("--cache", default=None,
+                        help=f"cache file (default: corpus/{CACHE_FILE})")
+    parser.add_argument("-w", "--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    path = args.cache or os.path.join(args.corpus, CACHE_FILE)
+
+    start = time.perf_counter()
+    cache = load_cache(path)
+    corpus, parsed = cached_crawl(args.corpus, cache, args.workers)
+    ranks, iterations = cached_pagerank(corpus, DAMPING, cache)
+    save_cache(path, cache)
+    elapsed = time.perf_counter() - start
+
+    print(f"PageRank Results from Incremental Iteration")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+    print(f"Re-parsed {len(parsed)} of {len(corpus)} pages, converged in "
+          f"{iterations} iterations, {elapsed:.3f} s")
+
+
+def load_cache(path):
+    """
+    Load a cache from `path`, or return an empty cache if there is none
+    or it cannot be used.
+
+    A cache holds, for each file name, the file's modification time, size,
+    SHA-256 hash and the links found in it, together with the damping
+    factor and rank of every page from the last run.
+    """
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        if cache.get("version") == VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": VERSION, "files": dict(), "damping": None, "ranks": dict()}
+
+
+def save_cache(path, cache):
+    """
+    Write `cache` to `path`, replacing any previous cache only once the
+    new one is completely written.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(cache, f)
+    os.replace(temporary, path)
+
+
+def file_hash(path):
+    """
+    Return the SHA-256 hash of the file at `path` as a hex string.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_crawl(directory, cache, workers=WORKERS):
+    """
+    Crawl a directory of HTML pages like `crawl`, re-parsing only files
+    that are new or changed since they were cached, and update `cache`.
+
+    A file is reused without being read if its modification time and
+    size are unchanged. Otherwise it is hashed, and only re-parsed if its
+    hash changed too.
+
+    Return the corpus dictionary and the list of file names parsed.
+    """
+    files = cache["files"]
+    filenames = [
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    ]
+    # Forget files that no longer exist
+    for filename in set(files) - set(filenames):
+        del files[filename]
+
+    changed = []
+    for filename in filenames:
+        path = os.path.join(directory, filename)
+        stat = os.stat(path)
+        entry = files.get(filename)
+        if (entry is not None and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["size"] == stat.st_size):
+            continue
+        digest = file_hash(path)
+        if entry is not None and entry["sha256"] == digest:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            continue
+        files[filename] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "links": None,
+        }
+        changed.append(filename)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        paths = [os.path.join(directory, filename) for filename in changed]
+        for filename, links in zip(changed, executor.map(extract_links, paths)):
+            files[filename]["links"] = sorted(links)
+
+    # Cached links are unfiltered, as the set of pages may have changed
+    pages = dict()
+    for filename in filenames:
+        pages[filename] = set(
+            link for link in files[filename]["links"]
+            if link in files and link != filename
+        )
+    return pages, changed
+
+
+def cached_pagerank(corpus, damping_factor, cache):
+    """
+    Compute PageRank for `corpus` by sparse power iteration, starting from
+    the ranks stored in `cache` if they were computed with the same
+    damping factor, and store the new ranks in `cache`.
+
+    Pages without a stored rank start at 1 / N.
+    Return the rank dictionary and the number of iterations made.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    initial = None
+    if cache["damping"] == damping_factor and cache["ranks"]:
+        previous = cache["ranks"]
+        initial = np.array([
+            previous.get(page, 1 / len(graph)) for page in graph.pages
+        ])
+    ranks, iterations = power_iteration(graph, damping_factor, initial=initial)
+    ranks = graph.to_dict(ranks)
+    cache["damping"] = damping_factor
+    cache["ranks"] = ranks
+    return ranks, iterations
+
+
+if __name__ == "__main__":
+    main()
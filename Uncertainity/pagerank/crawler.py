@@ -0,0 +1,118 @@
+import argparse
+import codecs
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+
+from edgelist import write_edgelist
+
+# Number of files read at the same time
+WORKERS = 8
+
+# Bytes fed to the link extractor at a time
+CHUNK_SIZE = 64 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Crawl a directory of HTML pages in parallel and report "
+                    "the crawl rate."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("-w", "--workers", type=int, default=WORKERS)
+    parser.add_argument("--mmap", action="store_true",
+                        help="memory-map files instead of reading them")
+    parser.add_argument("--edgelist", default=None,
+                        help="write the link graph to this edge-list file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    corpus = parallel_crawl(args.corpus, args.workers, args.mmap)
+    elapsed = time.perf_counter() - start
+    links = sum(len(links) for links in corpus.values())
+    print(f"Crawled {len(corpus)} pages with {links} links "
+          f"in {elapsed:.3f} s ({len(corpus) / elapsed:.1f} pages/s)")
+    if args.edgelist:
+        write_edgelist(corpus, args.edgelist)
+        print(f"Wrote edge list to {args.edgelist}")
+
+
+class LinkExtractor(HTMLParser):
+    """
+    Collects the `href` of every `<a>` tag in HTML fed to it, whether the
+    attribute value is double-quoted, single-quoted or unquoted.
+    Input can be fed in pieces of any size.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        for name, value in attrs:
+            if name == "href" and value is not None:
+                self.links.add(value)
+
+
+def extract_links(path, use_mmap=False):
+    """
+    Return the set of links in the HTML file at `path`, streaming the file
+    through a LinkExtractor in chunks rather than loading it whole.
+    """
+    extractor = LinkExtractor()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        if use_mmap:
+            size = os.fstat(f.fileno()).st_size
+            # Empty files cannot be memory-mapped
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for start in range(0, size, CHUNK_SIZE):
+                        extractor.feed(
+                            decoder.decode(mapped[start:start + CHUNK_SIZE])
+                        )
+        else:
+            while chunk := f.read(CHUNK_SIZE):
+                extractor.feed(decoder.decode(chunk))
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.links
+
+
+def parallel_crawl(directory, workers=WORKERS, use_mmap=False):
+    """
+    Parse a directory of HTML pages with a pool of threads and check for
+    links to other pages.
+    Return a dictionary where each key is a page, and values are
+    a set of all other pages in the corpus that are linked to by the page.
+    """
+    filenames = [
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    ]
+    # The set of pages is known before any file is read, so each page's
+    # links can be filtered and added to the graph as soon as it is parsed
+    names = set(filenames)
+    pages = dict()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = dict(
+            (executor.submit(
+                extract_links, os.path.join(directory, filename), use_mmap
+            ), filename)
+            for filename in filenames
+        )
+        for future in as_completed(futures):
+            filename = futures[future]
+            pages[filename] = set(
+                link for link in future.result()
+                if link in names and link != filename
+            )
+    return pages
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import sys
+
+import numpy as np
+
+from pagerank import DAMPING
+from sparse import MAX_ITERATIONS, TOLERANCE
+
+# Edge-list file layout: an 8-byte magic string, the number of pages and
+# of links as little-endian 64-bit integers, then one (source, target)
+# pair of little-endian 32-bit page numbers per link. Page names are
+# stored one per line, in page number order, in a file alongside.
+MAGIC = b"PREDGES1"
+HEADER = np.dtype([("magic", "S8"), ("pages", "<u8"), ("links", "<u8")])
+EDGE = np.dtype("<u4")
+
+# Links read into memory at a time
+CHUNK_LINKS = 1 << 22
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python edgelist.py edges")
+    ranks, iterations = outofcore_pagerank(sys.argv[1], DAMPING)
+    print(f"PageRank Results from Out-of-Core Iteration "
+          f"({iterations} iterations)")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def pages_path(path):
+    """
+    Return the path of the page names file for the edge list at `path`.
+    """
+    return f"{path}.pages"
+
+
+def write_edgelist(corpus, path):
+    """
+    Write the link graph of `corpus` (as returned by `crawl`) to a binary
+    edge-list file at `path`, and its page names alongside.
+    """
+    pages = sorted(corpus)
+    index = dict((page, i) for i, page in enumerate(pages))
+    links = sum(len(corpus[page]) for page in pages)
+    with open(path, "wb") as f:
+        f.write(np.array([(MAGIC, len(pages), links)], dtype=HEADER).tobytes())
+        for page in pages:
+            targets = sorted(index[link] for link in corpus[page])
+            edges = np.empty((len(targets), 2), dtype=EDGE)
+            edges[:, 0] = index[page]
+            edges[:, 1] = targets
+            f.write(edges.tobytes())
+    with open(pages_path(path), "w") as f:
+        for page in pages:
+            f.write(f"{page}\n")
+
+
+def read_header(path):
+    """
+    Return the number of pages and links in the edge-list file at `path`.
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} is not an edge-list file")
+    return int(header["pages"][0]), int(header["links"][0])
+
+
+def chunks(edges, chunk_links=CHUNK_LINKS):
+    """
+    Yield the source and target arrays of successive chunks of links.
+    """
+    for start in range(0, len(edges), chunk_links):
+        chunk = np.asarray(edges[start:start + chunk_links])
+        yield chunk[:, 0].astype(np.int64), chunk[:, 1].astype(np.int64)
+
+
+def outofcore_pagerank(path, damping_factor, tolerance=TOLERANCE,
+                       max_iterations=MAX_ITERATIONS, chunk_links=CHUNK_LINKS):
+    """
+    Return PageRank values for the edge-list file at `path`, streaming the
+    memory-mapped links in chunks on every iteration so that only vectors
+    of per-page values are held in memory.
+
+    Iteration stops when the L1 change between iterations is below
+    `tolerance`, as in `sparse_pagerank`.
+
+    Return a dictionary mapping page names (or numbers, if there is no
+    page names file) to PageRank values, and the number of iterations.
+    """
+    n, links = read_header(path)
+    edges = np.memmap(path, dtype=EDGE, mode="r", offset=HEADER.itemsize,
+                      shape=(links, 2))
+
+    # One pass to count the links out of every page
+    out_degree = np.zeros(n)
+    for sources, _ in chunks(edges, chunk_links):
+        out_degree += np.bincount(sources, minlength=n)
+    dangling = out_degree == 0
+
+    ranks = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        share = np.divide(ranks, out_degree, out=np.zeros(n), where=~dangling)
+        new_ranks = np.zeros(n)
+        for sources, targets in chunks(edges, chunk_links):
+            new_ranks += np.bincount(targets, weights=share[sources],
+                                     minlength=n)
+        dangling_rank = ranks[dangling].sum()
+        new_ranks = (damping_factor * new_ranks
+                     + (damping_factor * dangling_rank + 1 - damping_factor) / n)
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            break
+
+    try:
+        with open(pages_path(path)) as f:
+            pages = [line.rstrip("\n") for line in f]
+    except FileNotFoundError:
+        pages = list(range(n))
+    return dict((page, float(rank)) for page, rank in zip(pages, ranks)), iteration
+
+
+if __name__ == "__main__":
+    main()
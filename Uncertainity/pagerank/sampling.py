@@ -0,0 +1,167 @@
+import sys
+import time
+
+import numpy as np
+
+from pagerank import DAMPING, crawl
+from sparse import LinkGraph, sparse_pagerank
+
+SAMPLES = 1_000_000
+
+# Number of random surfers walking the graph in parallel
+SURFERS = 10_000
+
+# Steps every surfer takes before its visits are counted, so that where it
+# started no longer matters. Surfers are also limited to one per BURN_IN
+# samples, so burn-in never costs more steps than the sample itself.
+BURN_IN = 20
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python sampling.py corpus [samples]")
+    samples = int(sys.argv[2]) if len(sys.argv) == 3 else SAMPLES
+    corpus = crawl(sys.argv[1])
+    start = time.perf_counter()
+    ranks = vectorized_sample_pagerank(corpus, DAMPING, samples)
+    elapsed = time.perf_counter() - start
+    print(f"PageRank Results from Vectorized Sampling (n = {samples}, "
+          f"{elapsed:.3f} s)")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+    # Check the estimate against the converged ranks
+    exact = sparse_pagerank(corpus, DAMPING)
+    error = max(abs(ranks[page] - exact[page]) for page in exact)
+    print(f"Max difference from power iteration: {error:.4f}")
+
+
+def alias_tables(graph, weights=None):
+    """
+    Build alias tables for the choice of link out of every page.
+
+    `weights` optionally gives a weight for each link, in the order of
+    `graph.indices`; by default every link of a page is equally likely.
+    The tables are flattened in the same order: to follow a link out of
+    page `p`, pick a slot `s` uniformly from `indptr[p]..indptr[p + 1] - 1`,
+    then go to `indices[s]` with probability `probability[s]`, and to
+    `alias[s]` otherwise.
+
+    Returns the `probability` and `alias` arrays.
+    """
+    probability = np.ones(len(graph.indices))
+    alias = graph.indices.copy()
+    if weights is None:
+        return probability, alias
+
+    weights = np.asarray(weights, dtype=float)
+    for page in np.flatnonzero(~graph.dangling):
+        start, end = graph.indptr[page], graph.indptr[page + 1]
+        row = weights[start:end]
+        if np.all(row == row[0]):
+            continue
+
+        # Vose's method: pair each under-full slot with an over-full one
+        scaled = row * len(row) / row.sum()
+        small = [i for i in range(len(row)) if scaled[i] < 1]
+        large = [i for i in range(len(row)) if scaled[i] >= 1]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            probability[start + low] = scaled[low]
+            alias[start + low] = graph.indices[start + high]
+            scaled[high] -= 1 - scaled[low]
+            if scaled[high] < 1:
+                small.append(high)
+            else:
+                large.append(high)
+        for i in small + large:
+            probability[start + i] = 1
+    return probability, alias
+
+
+def vectorized_sample_pagerank(corpus, damping_factor, n, surfers=SURFERS,
+                               seed=None, burn_in=BURN_IN):
+    """
+    Return PageRank values for each page by sampling `n` pages with many
+    independent random surfers moving in parallel, each starting at a
+    page chosen at random and taking `burn_in` steps before its visits
+    are counted.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    counts = surf(graph, damping_factor, n, surfers,
+                  np.random.default_rng(seed), burn_in=burn_in)
+    return graph.to_dict(counts / counts.sum())
+
+
+def surf(graph, damping_factor, n, surfers, rng, tables=None,
+         burn_in=BURN_IN):
+    """
+    Walk `surfers` random surfers over `graph` until `n` pages have been
+    visited in total, and return the number of visits to each page.
+
+    Every surfer first takes `burn_in` steps that are not counted. There
+    are never more than `n // burn_in` surfers, so each one's counted
+    walk is at least `burn_in` steps long.
+
+    At every step a surfer follows one of the current page's links with
+    probability `damping_factor`, using alias tables so each step costs
+    O(1), and otherwise (or if the page has no links) jumps to a page
+    chosen uniformly at random.
+    """
+    tables = tables if tables is not None else alias_tables(graph)
+    pages_count = len(graph)
+    surfers = max(1, min(surfers, n // max(burn_in, 1)))
+    counts = np.zeros(pages_count, dtype=np.int64)
+
+    pages = rng.integers(pages_count, size=surfers)
+    for _ in range(burn_in):
+        pages = step_surfers(graph, pages, damping_factor, rng, tables)
+
+    # Visits are buffered and counted in batches, so each batch costs
+    # one pass over the pages however many steps it covers
+    visits = []
+    buffered = 0
+    remaining = n
+    while remaining > 0:
+        visited = pages[:remaining]
+        visits.append(visited)
+        buffered += len(visited)
+        remaining -= len(visited)
+        if buffered >= pages_count or remaining <= 0:
+            counts += np.bincount(np.concatenate(visits),
+                                  minlength=pages_count)
+            visits = []
+            buffered = 0
+        if remaining <= 0:
+            break
+        pages = step_surfers(graph, pages, damping_factor, rng, tables)
+    return counts
+
+
+def step_surfers(graph, pages, damping_factor, rng, tables):
+    """
+    Return the pages every surfer moves to next from `pages`, using the
+    `(probability, alias)` tables built by `alias_tables`.
+    """
+    probability, alias = tables
+    pages_count = len(graph)
+    following = ((rng.random(len(pages)) < damping_factor)
+                 & ~graph.dangling[pages])
+    next_pages = rng.integers(pages_count, size=len(pages))
+    current = pages[following]
+    slots = graph.indptr[current] + (
+        rng.random(len(current)) * graph.out_degree[current]
+    ).astype(np.int64)
+    accept = rng.random(len(current)) < probability[slots]
+    next_pages[following] = np.where(
+        accept, graph.indices[slots], alias[slots]
+    )
+    return next_pages
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from crawler import parallel_crawl
+from pagerank import DAMPING
+from sparse import MAX_ITERATIONS, TOLERANCE, LinkGraph, step
+
+# Number of plain iterations between extrapolation steps
+EXTRAPOLATION_PERIOD = 10
+
+SolveResult = namedtuple(
+    "SolveResult", ["ranks", "iterations", "residuals", "converged"]
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare PageRank solvers on a corpus."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--max-iterations", type=int, default=MAX_ITERATIONS)
+    args = parser.parse_args()
+
+    graph = LinkGraph.from_corpus(parallel_crawl(args.corpus))
+    print(f"{len(graph)} pages, {len(graph.indices)} links")
+    for method in SOLVERS:
+        start = time.perf_counter()
+        result = solve(graph, DAMPING, method, args.tolerance,
+                       args.max_iterations)
+        elapsed = time.perf_counter() - start
+        status = "converged" if result.converged else "did not converge"
+        print(f"  {method}: {status} in {result.iterations} iterations, "
+              f"residual {result.residuals[-1]:.2e}, {elapsed * 1e3:.1f} ms")
+
+
+def solve(corpus, damping_factor, method="jacobi", tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS, initial=None):
+    """
+    Compute PageRank for `corpus` (a corpus dictionary or a LinkGraph)
+    with the solver named `method`, one of the keys of `SOLVERS`.
+
+    Iteration stops once the L1 residual, the L1 norm of the change one
+    PageRank transition would make to the current ranks, is below
+    `tolerance`, or after `max_iterations` iterations.
+
+    Return a SolveResult holding the PageRank dictionary, the number of
+    iterations made, the residual after every iteration, and whether the
+    solver converged.
+    """
+    if method not in SOLVERS:
+        raise ValueError(f"unknown solver {method!r}")
+    graph = corpus if isinstance(corpus, LinkGraph) else LinkGraph.from_corpus(corpus)
+    n = len(graph)
+    ranks = np.full(n, 1 / n) if initial is None else (
+        np.asarray(initial, dtype=float) / np.sum(initial)
+    )
+    ranks, residuals = SOLVERS[method](
+        graph, damping_factor, ranks, tolerance, max_iterations
+    )
+    return SolveResult(
+        graph.to_dict(ranks), len(residuals), residuals,
+        bool(residuals) and residuals[-1] < tolerance
+    )
+
+
+def residual(graph, ranks, damping_factor):
+    """
+    Return the next rank vector and the L1 distance to it.
+    """
+    new_ranks = step(graph, ranks, damping_factor)
+    return new_ranks, float(np.abs(new_ranks - ranks).sum())
+
+
+def jacobi(graph, damping_factor, ranks, tolerance, max_iterations):
+    """
+    Plain power (Jacobi) iteration: every page is updated from the
+    previous iteration's ranks.
+    """
+    residuals = []
+    for _ in range(max_iterations):
+        ranks, change = residual(graph, ranks, damping_factor)
+        residuals.append(change)
+        if change < tolerance:
+            break
+    return ranks, residuals
+
+
+def gauss_seidel(graph, damping_factor, ranks, tolerance, max_iterations):
+    """
+    Gauss-Seidel iteration: pages are updated in turn, each one using the
+    ranks already updated earlier in the same sweep. This usually needs
+    fewer sweeps than Jacobi, but a sweep is a Python loop over the pages.
+    """
+    n = len(graph)
+    # Incoming links of every page, as lists of (source, 1 / out degree)
+    sources = graph.sources[graph.in_order].tolist()
+    weights = (1 / graph.out_degree[graph.sources[graph.in_order]]).tolist()
+    starts = np.concatenate(
+        [[0], np.cumsum(np.bincount(graph.indices, minlength=n))]
+    ).tolist()
+    dangling = graph.dangling.tolist()
+
+    ranks = ranks.tolist()
+    teleport = (1 - damping_factor) / n
+    dangling_rank = sum(rank for rank, d in zip(ranks, dangling) if d)
+    residuals = []
+    for _ in range(max_iterations):
+        for page in range(n):
+            rank = sum(
+                ranks[sources[k]] * weights[k]
+                for k in range(starts[page], starts[page + 1])
+            )
+            rank = (damping_factor * (rank + dangling_rank / n) + teleport)
+            if dangling[page]:
+                dangling_rank += rank - ranks[page]
+            ranks[page] = rank
+        vector = np.array(ranks)
+        vector /= vector.sum()
+        _, change = residual(graph, vector, damping_factor)
+        residuals.append(change)
+        ranks = vector.tolist()
+        dangling_rank = float(vector[graph.dangling].sum())
+        if change < tolerance:
+            break
+    return np.array(ranks), residuals
+
+
+def aitken(graph, damping_factor, ranks, tolerance, max_iterations):
+    """
+    Power iteration with Aitken extrapolation every EXTRAPOLATION_PERIOD
+    iterations: each page's rank is extrapolated from its last three
+    values, assuming the error shrinks geometrically.
+    """
+    residuals = []
+    history = []
+    for iteration in range(1, max_iterations + 1):
+        ranks, change = residual(graph, ranks, damping_factor)
+        history = (history + [ranks])[-3:]
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 3:
+            first, second, third = history
+            g = (second - first) ** 2
+            h = third - 2 * second + first
+            extrapolated = first - np.divide(
+                g, h, out=np.zeros_like(g), where=np.abs(h) > 1e-15
+            )
+            ranks = normalize(extrapolated, third)
+            _, change = residual(graph, ranks, damping_factor)
+            history = []
+        residuals.append(change)
+        if change < tolerance:
+            break
+    return ranks, residuals
+
+
+def quadratic(graph, damping_factor, ranks, tolerance, max_iterations):
+    """
+    Power iteration with quadratic extrapolation every
+    EXTRAPOLATION_PERIOD iterations (Kamvar et al.): the last four
+    iterates are used to cancel the error along the next two
+    eigenvectors by a small least-squares fit.
+    """
+    residuals = []
+    history = []
+    for iteration in range(1, max_iterations + 1):
+        ranks, change = residual(graph, ranks, damping_factor)
+        history = (history + [ranks])[-4:]
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 4:
+            x0, x1, x2, x3 = history
+            y = np.column_stack([x1 - x0, x2 - x0])
+            gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+            gamma1, gamma2, gamma3 = gamma[0], gamma[1], 1
+            extrapolated = ((gamma1 + gamma2 + gamma3) * x1
+                            + (gamma2 + gamma3) * x2 + gamma3 * x3)
+            ranks = normalize(extrapolated, x3)
+            _, change = residual(graph, ranks, damping_factor)
+            history = []
+        residuals.append(change)
+        if change < tolerance:
+            break
+    return ranks, residuals
+
+
+def normalize(extrapolated, fallback):
+    """
+    Clip an extrapolated rank vector to be non-negative and scale it to
+    sum to 1, or return `fallback` if extrapolation broke down.
+    """
+    extrapolated = np.clip(extrapolated, 0, None)
+    total = extrapolated.sum()
+    if not np.isfinite(total) or total <= 0:
+        return fallback
+    return extrapolated / total
+
+
+SOLVERS = {
+    "jacobi": jacobi,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken,
+    "quadratic": quadratic,
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import sys
+
+import numpy as np
+
+from pagerank import DAMPING, crawl
+
+# Stop iterating once the L1 change in the rank vector falls below this
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python sparse.py corpus")
+    corpus = crawl(sys.argv[1])
+    ranks = sparse_pagerank(corpus, DAMPING)
+    print(f"PageRank Results from Sparse Iteration")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+class LinkGraph:
+    """
+    Link graph in compressed sparse row (CSR) form.
+
+    Pages are numbered 0..n-1 in `pages`. The pages linked to by page `i`
+    are `indices[indptr[i]:indptr[i + 1]]`, and `out_degree[i]` is their
+    number. Pages without links are marked in `dangling`.
+    """
+
+    def __init__(self, pages, indptr, indices):
+        self.pages = list(pages)
+        self.index = dict((page, i) for i, page in enumerate(self.pages))
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.out_degree = np.diff(self.indptr)
+        self.dangling = self.out_degree == 0
+
+        # Source page of every link, in the same order as `indices`
+        self.sources = np.repeat(np.arange(len(self.pages)), self.out_degree)
+
+        # Links ordered by target page, with the pages that have incoming
+        # links and where each one's links start in that order
+        self.in_order = np.argsort(self.indices, kind="stable")
+        self.in_targets, self.in_starts = np.unique(
+            self.indices[self.in_order], return_index=True
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build a link graph from a corpus dictionary as returned by `crawl`.
+        """
+        pages = sorted(corpus)
+        index = dict((page, i) for i, page in enumerate(pages))
+        indptr = [0]
+        indices = []
+        for page in pages:
+            indices.extend(sorted(index[link] for link in corpus[page]))
+            indptr.append(len(indices))
+        return cls(pages, indptr, indices)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def to_dict(self, ranks):
+        """
+        Map a rank vector back to a dictionary keyed by page name.
+        """
+        return dict((page, float(rank)) for page, rank in zip(self.pages, ranks))
+
+
+def sparse_pagerank(corpus, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS):
+    """
+    Return PageRank values for each page by power iteration over a sparse
+    transition matrix, until the L1 change between iterations is below
+    `tolerance`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = power_iteration(graph, damping_factor, tolerance, max_iterations)
+    return graph.to_dict(ranks)
+
+
+def personalized_pagerank(corpus, damping_factor, personalizations,
+                          tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Return PageRank values personalized to each of `personalizations`,
+    solving all of them together over one shared transition matrix.
+
+    Each personalization is either a collection of seed pages, which are
+    teleported to with equal probability, or a dictionary mapping pages
+    to teleport weights. With probability `1 - damping_factor`, and from
+    pages without links, the surfer teleports to a page drawn from the
+    personalization instead of from all pages in the corpus.
+
+    `corpus` may also be a LinkGraph, so that further batches of
+    personalizations can reuse the same graph.
+
+    Return a list with one PageRank dictionary per personalization.
+    """
+    if isinstance(corpus, LinkGraph):
+        graph = corpus
+    else:
+        graph = LinkGraph.from_corpus(corpus)
+    teleport = np.zeros((len(graph), len(personalizations)))
+    for k, personalization in enumerate(personalizations):
+        if not isinstance(personalization, dict):
+            personalization = dict.fromkeys(personalization, 1)
+        for page, weight in personalization.items():
+            teleport[graph.index[page], k] = weight
+        total = teleport[:, k].sum()
+        if total <= 0:
+            raise ValueError("personalization must give some page a weight")
+        teleport[:, k] /= total
+    ranks, _ = power_iteration(graph, damping_factor, tolerance,
+                               max_iterations, teleport=teleport)
+    return [graph.to_dict(ranks[:, k]) for k in range(len(personalizations))]
+
+
+def link_sums(graph, values):
+    """
+    Sum values given for each link (in the order of `graph.indices`) into
+    the pages they link to. `values` may have one column per rank vector.
+    """
+    n = len(graph)
+    if values.ndim == 1:
+        return np.bincount(graph.indices, weights=values, minlength=n)
+    sums = np.zeros((n,) + values.shape[1:])
+    if len(values):
+        sums[graph.in_targets] = np.add.reduceat(
+            values[graph.in_order], graph.in_starts, axis=0
+        )
+    return sums
+
+
+def step(graph, ranks, damping_factor, teleport=None):
+    """
+    Apply the PageRank transition once to `ranks`, a rank vector or an
+    N x K matrix with one rank vector per column.
+
+    Each page shares its rank equally among its links. Pages without
+    links are treated as linking to every page, which is a rank-one
+    correction added uniformly instead of being stored in the matrix.
+    If `teleport` is given (same shape as `ranks`, columns summing to 1),
+    teleports and pages without links go to pages in those proportions.
+    """
+    n = len(graph)
+    if ranks.ndim == 1:
+        degree, dangling = graph.out_degree, graph.dangling
+    else:
+        degree, dangling = graph.out_degree[:, None], graph.dangling[:, None]
+    share = np.divide(ranks, degree, out=np.zeros_like(ranks),
+                      where=~dangling)
+    new_ranks = link_sums(graph, share[graph.sources])
+    dangling_rank = ranks[graph.dangling].sum(axis=0)
+    leaked = damping_factor * dangling_rank + 1 - damping_factor
+    if teleport is None:
+        return damping_factor * new_ranks + leaked / n
+    return damping_factor * new_ranks + leaked * teleport
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, initial=None, teleport=None):
+    """
+    Iterate the PageRank transition from `initial` until the L1 change
+    between iterations is below `tolerance`, or until `max_iterations`
+    iterations have been made.
+
+    With an N x K `teleport` matrix, K personalized rank vectors are
+    iterated together until every one of them has converged. `initial`
+    defaults to the uniform vector, or to `teleport` if given.
+
+    Return the rank vector (or N x K matrix) and the number of
+    iterations made.
+    """
+    n = len(graph)
+    if initial is None:
+        ranks = np.full(n, 1 / n) if teleport is None else teleport.copy()
+    else:
+        ranks = np.asarray(initial, dtype=float)
+        ranks = ranks / ranks.sum(axis=0)
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = step(graph, ranks, damping_factor, teleport)
+        change = np.abs(new_ranks - ranks).sum(axis=0).max()
+        ranks = new_ranks
+        if change < tolerance:
+            break
+    return ranks, iteration
+
+
+if __name__ == "__main__":
+    main()